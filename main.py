@@ -14,11 +14,15 @@ from src.utils.logger import get_logger
 
 logger = get_logger('main')
 
+# Set by signal handlers; main() waits on it so shutdown runs the
+# normal cleanup path instead of raising SystemExit mid-await
+shutdown_event = asyncio.Event()
+
 
 def signal_handler(signum, frame):
     """Handle shutdown signals gracefully."""
     logger.info(f"Received signal {signum}, shutting down...")
-    sys.exit(0)
+    shutdown_event.set()
 
 
 async def main():
@@ -50,9 +54,14 @@ async def main():
         logger.error(f"Failed to initialize database: {e}")
         sys.exit(1)
     
-    # Setup signal handlers
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    # Setup signal handlers (loop-integrated on Unix, fallback elsewhere)
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGINT, shutdown_event.set)
+        loop.add_signal_handler(signal.SIGTERM, shutdown_event.set)
+    except NotImplementedError:
+        signal.signal(signal.SIGINT, signal_handler)
+        signal.signal(signal.SIGTERM, signal_handler)
     
     # Start scheduler
     try:
@@ -69,8 +78,8 @@ async def main():
         logger.info("System is running. Press Ctrl+C to stop.")
         logger.info("="*60 + "\n")
         
-        await scheduler.keep_running()
-        
+        await shutdown_event.wait()
+
     except KeyboardInterrupt:
         logger.info("\nShutdown requested by user")
     except Exception as e:
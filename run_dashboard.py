@@ -41,12 +41,18 @@ def main():
     logger.info("="*60 + "\n")
     
     try:
-        app.run(
-            host=host,
-            port=port,
-            debug=debug,
-            threaded=True
-        )
+        if debug:
+            # Dev server with reloader for local debugging only
+            app.run(
+                host=host,
+                port=port,
+                debug=True,
+                threaded=True
+            )
+        else:
+            # Production WSGI server - handles concurrent requests properly
+            from waitress import serve
+            serve(app, host=host, port=port, threads=8)
     except KeyboardInterrupt:
         logger.info("\nDashboard stopped by user")
     except Exception as e:
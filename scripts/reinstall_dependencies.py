@@ -1,27 +1,47 @@
 #!/usr/bin/env python3
 """Script for complete reinstallation of dependencies."""
 
+import shutil
 import subprocess
 import sys
 
+# Prefer uv when available - its resolver installs dependencies far faster
+UV = shutil.which("uv")
+
+
+def _uninstall_cmd(packages):
+    if UV:
+        return ["uv", "pip", "uninstall", *packages]
+    return [sys.executable, "-m", "pip", "uninstall", "-y", *packages]
+
+
+def _install_cmd():
+    if UV:
+        return ["uv", "pip", "install", "-r", "requirements.txt", "--upgrade", "--reinstall"]
+    return [
+        sys.executable, "-m", "pip", "install", "-r", "requirements.txt",
+        "--upgrade", "--force-reinstall", "--no-cache-dir",
+    ]
+
+
 def main():
     print("🔄 Removing old dependencies...")
-    result = subprocess.run([sys.executable, "-m", "pip", "uninstall", "-y", "instagrapi", "pydantic"])
+    result = subprocess.run(_uninstall_cmd(["instagrapi", "pydantic"]))
     if result.returncode != 0:
         print("⚠️  Warning: Failed to uninstall some packages (may not be installed)")
-    
+
     print("🧹 Clearing pip cache...")
     result = subprocess.run([sys.executable, "-m", "pip", "cache", "purge"])
     if result.returncode != 0:
         print("❌ Error: Failed to clear pip cache")
         sys.exit(1)
-    
+
     print("📦 Installing new dependencies...")
-    result = subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt", "--upgrade", "--force-reinstall"])
+    result = subprocess.run(_install_cmd())
     if result.returncode != 0:
         print("❌ Error: Failed to install dependencies")
         sys.exit(1)
-    
+
     print("✅ Done!")
 
 if __name__ == "__main__":
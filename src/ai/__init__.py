@@ -1,5 +1,5 @@
 """AI analysis module initialization."""
-from .analyzer import AIAnalyzer
+from .analyzer import AIAnalyzer, AsyncAIAnalyzer
 from .recommendations import RecommendationGenerator
 
-__all__ = ['AIAnalyzer', 'RecommendationGenerator']
+__all__ = ['AIAnalyzer', 'AsyncAIAnalyzer', 'RecommendationGenerator']
@@ -1,5 +1,7 @@
 """AI analyzer using OpenAI GPT for content analysis."""
-import openai
+import hashlib
+import re
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 from config.settings import settings
 from src.ai import prompts
@@ -7,6 +9,34 @@ from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Combined pattern so score, hashtags and improved caption are all
+# collected in a single pass over the response text
+_COMBINED_RE = re.compile(
+    r'ОЦІНКА[^:\n\d]*[:\s]+(?P<score>\d+)'
+    r'|(?P<score_alt>\d+)/10'
+    r'|(?P<hashtag>#\w+)'
+    r'|ПОКРАЩЕНИЙ ВАРІАНТ:(?P<improved>.+?)(?:\n\n|\d\.|$)',
+    re.DOTALL | re.IGNORECASE
+)
+
+
+@lru_cache(maxsize=4)
+def _get_client(api_key: str):
+    """Shared OpenAI client per API key.
+
+    Reusing one client keeps its httpx connection pool (and TLS session)
+    alive across analyzer instances instead of re-handshaking per task.
+    """
+    import openai
+    return openai.OpenAI(api_key=api_key)
+
+
+@lru_cache(maxsize=4)
+def _get_async_client(api_key: str):
+    """Shared AsyncOpenAI client per API key."""
+    import openai
+    return openai.AsyncOpenAI(api_key=api_key)
+
 
 class AIAnalyzer:
     """AI-powered content analyzer using OpenAI GPT."""
@@ -21,20 +51,40 @@ class AIAnalyzer:
         """
         self.api_key = api_key or settings.OPENAI_API_KEY
         self.model = model or settings.OPENAI_MODEL
-        openai.api_key = self.api_key
-        self.client = openai.OpenAI(api_key=self.api_key)
+        self.client = _get_client(self.api_key)
     
-    def _call_gpt(self, prompt: str, max_tokens: int = 1000) -> Optional[str]:
+    def _cache_path(self, prompt: str):
+        """Get on-disk cache path for a (model, prompt) pair."""
+        key = hashlib.blake2b(f"{self.model}|{prompt}".encode()).hexdigest()
+        return settings.DATA_DIR / 'gpt_cache' / f"{key}.txt"
+
+    def _call_gpt(self, prompt: str, max_tokens: int = 1000, use_cache: bool = True, stream: bool = False):
         """
         Make a call to GPT API.
-        
+
+        Identical (model, prompt) pairs are served from an on-disk cache,
+        so re-runs and backfills skip the HTTP round-trip.
+
         Args:
             prompt: Prompt to send
             max_tokens: Maximum tokens in response
-            
+            use_cache: Whether to read/write the response cache
+            stream: Yield response chunks as they arrive instead of
+                waiting for the full completion (better perceived latency
+                for dashboard endpoints)
+
         Returns:
-            Response text or None if failed
+            Response text (or a generator of text chunks when streaming),
+            or None if failed
         """
+        if stream:
+            return self._stream_gpt(prompt, max_tokens=max_tokens)
+
+        cache_path = self._cache_path(prompt) if use_cache else None
+
+        if cache_path is not None and cache_path.exists():
+            return cache_path.read_text(encoding='utf-8')
+
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
@@ -45,13 +95,42 @@ class AIAnalyzer:
                 max_tokens=max_tokens,
                 temperature=0.7,
             )
-            
-            return response.choices[0].message.content.strip()
-            
+
+            text = response.choices[0].message.content.strip()
+
+            if cache_path is not None:
+                try:
+                    cache_path.parent.mkdir(parents=True, exist_ok=True)
+                    cache_path.write_text(text, encoding='utf-8')
+                except OSError as e:
+                    logger.warning(f"Failed to write GPT cache: {e}")
+
+            return text
+
         except Exception as e:
             logger.error(f"GPT API call failed: {e}")
             return None
-    
+
+    def _stream_gpt(self, prompt: str, max_tokens: int = 1000):
+        """Stream GPT response chunks as they arrive."""
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": "Ти експерт з Instagram маркетингу та SMM. Надаєш професійні поради українською мовою."},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=max_tokens,
+                temperature=0.7,
+                stream=True,
+            )
+
+            for chunk in response:
+                yield chunk.choices[0].delta.content or ''
+
+        except Exception as e:
+            logger.error(f"GPT API call failed: {e}")
+
     def analyze_caption(
         self,
         caption: str,
@@ -73,12 +152,12 @@ class AIAnalyzer:
         """
         logger.info("Analyzing caption with AI...")
         
-        prompt = prompts.CAPTION_ANALYSIS_PROMPT.format(
-            caption=caption,
-            likes=likes,
-            comments=comments,
-            engagement_rate=engagement_rate
-        )
+        prompt = prompts.CAPTION_ANALYSIS_FN({
+            'caption': caption,
+            'likes': likes,
+            'comments': comments,
+            'engagement_rate': engagement_rate
+        })
         
         response = self._call_gpt(prompt, max_tokens=1500)
         
@@ -125,10 +204,10 @@ class AIAnalyzer:
         
         hashtags_str = " ".join(hashtags) if hashtags else "немає хештегів"
         
-        prompt = prompts.HASHTAGS_ANALYSIS_PROMPT.format(
-            hashtags=hashtags_str,
-            topic=topic
-        )
+        prompt = prompts.HASHTAGS_ANALYSIS_FN({
+            'hashtags': hashtags_str,
+            'topic': topic
+        })
         
         response = self._call_gpt(prompt, max_tokens=1000)
         
@@ -160,22 +239,26 @@ class AIAnalyzer:
         """
         logger.info(f"Analyzing batch of {len(posts)} posts with AI...")
         
-        # Create posts summary
-        posts_summary = []
-        for i, post in enumerate(posts[:10], 1):  # Limit to 10 for token management
-            caption_preview = post.get('caption', '')[:100]
-            posts_summary.append(
-                f"{i}. Лайки: {post.get('likes_count', 0)}, "
-                f"Коментарі: {post.get('comments_count', 0)}, "
-                f"ER: {post.get('engagement_rate', 0)}%\n"
+        # Create posts summary (limit to 10 for token management)
+        def _summarize(i, post):
+            caption_preview = (post.get('caption') or '')[:100]
+            likes = post.get('likes_count', 0)
+            comments = post.get('comments_count', 0)
+            er = post.get('engagement_rate', 0)
+            return (
+                f"{i}. Лайки: {likes}, "
+                f"Коментарі: {comments}, "
+                f"ER: {er}%\n"
                 f"   Текст: {caption_preview}..."
             )
-        
-        prompt = prompts.BATCH_ANALYSIS_PROMPT.format(
-            posts_summary="\n".join(posts_summary),
-            avg_engagement=avg_engagement,
-            posts_count=len(posts)
-        )
+
+        prompt = prompts.BATCH_ANALYSIS_FN({
+            'posts_summary': "\n".join(
+                _summarize(i, post) for i, post in enumerate(posts[:10], 1)
+            ),
+            'avg_engagement': avg_engagement,
+            'posts_count': len(posts)
+        })
         
         response = self._call_gpt(prompt, max_tokens=1500)
         
@@ -209,13 +292,14 @@ class AIAnalyzer:
         """
         logger.info("Generating improved caption with AI...")
         
-        prompt = prompts.CAPTION_IMPROVEMENT_PROMPT.format(
-            original_caption=original_caption,
-            min_length=min_length,
-            style=style
-        )
-        
-        response = self._call_gpt(prompt, max_tokens=1000)
+        prompt = prompts.CAPTION_IMPROVEMENT_FN({
+            'original_caption': original_caption,
+            'min_length': min_length,
+            'style': style
+        })
+
+        # Skip the cache so repeated requests get fresh creative variants
+        response = self._call_gpt(prompt, max_tokens=1000, use_cache=False)
         
         if response:
             improved = self._extract_improved_caption(response)
@@ -239,7 +323,7 @@ class AIAnalyzer:
         """
         logger.info("Analyzing tone with AI...")
         
-        prompt = prompts.TONE_ANALYSIS_PROMPT.format(text=text)
+        prompt = prompts.TONE_ANALYSIS_FN({'text': text})
         response = self._call_gpt(prompt, max_tokens=800)
         
         if response:
@@ -267,62 +351,181 @@ class AIAnalyzer:
         """
         logger.info("Generating general recommendations with AI...")
         
-        prompt = prompts.GENERAL_RECOMMENDATIONS_PROMPT.format(
-            posts_count=stats.get('posts_count', 0),
-            stories_count=stats.get('stories_count', 0),
-            reels_count=stats.get('reels_count', 0),
-            avg_engagement=stats.get('avg_engagement', 0.0),
-            followers_change=stats.get('followers_change', 0),
-            target_posts=targets.get('posts_per_month', 20),
-            target_stories=targets.get('stories_per_day', 3),
-            target_reels=targets.get('reels_per_week', 2),
-            target_engagement=targets.get('min_engagement_rate', 3.5)
-        )
+        prompt = prompts.GENERAL_RECOMMENDATIONS_FN({
+            'posts_count': stats.get('posts_count', 0),
+            'stories_count': stats.get('stories_count', 0),
+            'reels_count': stats.get('reels_count', 0),
+            'avg_engagement': stats.get('avg_engagement', 0.0),
+            'followers_change': stats.get('followers_change', 0),
+            'target_posts': targets.get('posts_per_month', 20),
+            'target_stories': targets.get('stories_per_day', 3),
+            'target_reels': targets.get('reels_per_week', 2),
+            'target_engagement': targets.get('min_engagement_rate', 3.5)
+        })
         
         response = self._call_gpt(prompt, max_tokens=1500)
         return response
     
+    def _parse_response(self, text: str) -> Dict[str, Any]:
+        """Extract score, hashtags and improved caption in one pass.
+
+        The parse of the last response is memoized so consecutive
+        _extract_* calls on the same text don't rescan it.
+        """
+        cached = getattr(self, '_last_parse', None)
+        if cached is not None and cached[0] == text:
+            return cached[1]
+
+        result: Dict[str, Any] = {'score': None, 'hashtags': [], 'improved': None}
+
+        # A labeled "ОЦІНКА: N" always wins over a bare "N/10", no
+        # matter which appears first, so the fallback is kept separately
+        score_alt = None
+        for match in _COMBINED_RE.finditer(text):
+            if match.group('hashtag'):
+                result['hashtags'].append(match.group('hashtag'))
+            elif match.group('score'):
+                if result['score'] is None:
+                    result['score'] = float(match.group('score'))
+            elif match.group('score_alt'):
+                if score_alt is None:
+                    score_alt = float(match.group('score_alt'))
+            elif result['improved'] is None and match.group('improved'):
+                result['improved'] = match.group('improved').strip()
+
+        if result['score'] is None:
+            result['score'] = score_alt
+
+        self._last_parse = (text, result)
+        return result
+
     def _extract_score(self, text: str) -> float:
         """Extract numerical score from AI response."""
         try:
             # Look for patterns like "ОЦІНКА: 7" or "7/10"
-            import re
-            patterns = [
-                r'ОЦІНКА[:\s]+(\d+)',
-                r'(\d+)/10',
-                r'оцінка[:\s]+(\d+)',
-            ]
-            
-            for pattern in patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    score = float(match.group(1))
-                    return min(max(score, 0), 10)  # Clamp between 0-10
-            
+            score = self._parse_response(text)['score']
+            if score is not None:
+                return min(max(score, 0), 10)  # Clamp between 0-10
+
             return 5.0  # Default score
-            
+
         except Exception:
             return 5.0
-    
+
     def _extract_hashtags(self, text: str) -> List[str]:
         """Extract hashtags from AI response."""
         try:
-            import re
             # Find all words starting with #
-            hashtags = re.findall(r'#\w+', text)
+            hashtags = self._parse_response(text)['hashtags']
             return hashtags[:15]  # Limit to 15
         except Exception:
             return []
-    
+
     def _extract_improved_caption(self, text: str) -> Optional[str]:
         """Extract improved caption from AI response."""
         try:
             # Look for section after "ПОКРАЩЕНИЙ ВАРІАНТ:"
-            import re
-            pattern = r'ПОКРАЩЕНИЙ ВАРІАНТ:(.+?)(?:\n\n|\d\.|$)'
-            match = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
-            return None
+            return self._parse_response(text)['improved']
         except Exception:
             return None
+
+
+class AsyncAIAnalyzer(AIAnalyzer):
+    """Async variant of AIAnalyzer for concurrent batch analysis.
+
+    Independent GPT calls are network-bound, so running them concurrently
+    via asyncio reduces wall time to roughly the slowest request instead
+    of the sum of all requests.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
+        """
+        Initialize async AI analyzer.
+
+        Args:
+            api_key: OpenAI API key (optional, uses settings if not provided)
+            model: Model to use (optional, uses settings if not provided)
+        """
+        super().__init__(api_key=api_key, model=model)
+        self.async_client = _get_async_client(self.api_key)
+
+    async def _call_gpt_async(self, prompt: str, max_tokens: int = 1000) -> Optional[str]:
+        """
+        Make an async call to GPT API.
+
+        Args:
+            prompt: Prompt to send
+            max_tokens: Maximum tokens in response
+
+        Returns:
+            Response text or None if failed
+        """
+        try:
+            response = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": "Ти експерт з Instagram маркетингу та SMM. Надаєш професійні поради українською мовою."},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=max_tokens,
+                temperature=0.7,
+            )
+
+            return response.choices[0].message.content.strip()
+
+        except Exception as e:
+            logger.error(f"GPT API call failed: {e}")
+            return None
+
+    async def analyze_many(
+        self,
+        posts: List[Dict[str, Any]],
+        max_tokens: int = 1500
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Analyze captions of multiple posts concurrently.
+
+        Args:
+            posts: List of post dictionaries
+            max_tokens: Maximum tokens per response
+
+        Returns:
+            List of analysis dictionaries (None where analysis failed),
+            in the same order as the input posts
+        """
+        import asyncio
+
+        logger.info(f"Analyzing {len(posts)} posts concurrently with AI...")
+
+        post_prompts = [
+            prompts.CAPTION_ANALYSIS_FN({
+                'caption': post.get('caption', ''),
+                'likes': post.get('likes_count', 0),
+                'comments': post.get('comments_count', 0),
+                'engagement_rate': post.get('engagement_rate', 0.0)
+            })
+            for post in posts
+        ]
+
+        responses = await asyncio.gather(
+            *[self._call_gpt_async(p, max_tokens=max_tokens) for p in post_prompts],
+            return_exceptions=True
+        )
+
+        results = []
+        for post, response in zip(posts, responses):
+            if isinstance(response, Exception) or not response:
+                results.append(None)
+                continue
+            results.append({
+                'analysis': response,
+                'score': self._extract_score(response),
+                'original_caption': post.get('caption', ''),
+                'metrics': {
+                    'likes': post.get('likes_count', 0),
+                    'comments': post.get('comments_count', 0),
+                    'engagement_rate': post.get('engagement_rate', 0.0)
+                }
+            })
+
+        return results
@@ -167,3 +167,12 @@ TONE_ANALYSIS_PROMPT = """
 
 Відповідай українською мовою.
 """
+
+# Pre-bound format callables so hot call sites skip per-call attribute
+# and format-method lookups on the template strings
+CAPTION_ANALYSIS_FN = CAPTION_ANALYSIS_PROMPT.format_map
+HASHTAGS_ANALYSIS_FN = HASHTAGS_ANALYSIS_PROMPT.format_map
+BATCH_ANALYSIS_FN = BATCH_ANALYSIS_PROMPT.format_map
+GENERAL_RECOMMENDATIONS_FN = GENERAL_RECOMMENDATIONS_PROMPT.format_map
+CAPTION_IMPROVEMENT_FN = CAPTION_IMPROVEMENT_PROMPT.format_map
+TONE_ANALYSIS_FN = TONE_ANALYSIS_PROMPT.format_map
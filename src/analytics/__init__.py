@@ -2,9 +2,11 @@
 from src.analytics.performance import PerformanceAnalyzer
 from src.analytics.competitors import CompetitorAnalyzer
 from src.analytics.hashtags import HashtagAnalyzer
+from src.analytics.facade import AnalyticsFacade
 
 __all__ = [
     'PerformanceAnalyzer',
     'CompetitorAnalyzer',
-    'HashtagAnalyzer'
+    'HashtagAnalyzer',
+    'AnalyticsFacade'
 ]
@@ -1,4 +1,8 @@
 """Competitor analysis for Instagram accounts."""
+import heapq
+import time
+from copy import deepcopy
+from operator import itemgetter
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 from src.database.repository import Repository
@@ -8,101 +12,227 @@ from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# How long a computed comparison stays valid; gap analysis and
+# benchmarking both start from the same comparison, so a short TTL
+# halves repository round-trips on the dashboard path
+_COMPARE_CACHE_TTL = 60
+
+# How long a fetched competitor snapshot is reused before hitting the
+# database again; competitor data only changes on scheduled refreshes
+_COMPETITOR_FETCH_TTL = 30
+
+# Shared default repository: analyzers constructed without explicit
+# dependency injection reuse one session on the pooled engine instead
+# of opening a connection per instance
+_default_repository: Optional[Repository] = None
+
+
+def _get_default_repository() -> Repository:
+    global _default_repository
+    if _default_repository is None:
+        _default_repository = Repository()
+    return _default_repository
+
+
+def _top3(values, rows):
+    """Top three rows by a numeric column, via O(n) partition.
+
+    argpartition finds the three largest without sorting the whole
+    column; only those three are then ordered.
+    """
+    import numpy as np
+
+    if len(values) <= 3:
+        idx = np.argsort(-values)
+    else:
+        idx = np.argpartition(values, -3)[-3:]
+        idx = idx[np.argsort(-values[idx])]
+    return [rows[i] for i in idx]
+
+
+# Metrics compared against competitor averages, and the shared
+# read-only gap entry used whenever a metric has no competitor data
+_GAP_METRICS = ('avg_engagement_rate', 'avg_likes', 'avg_comments')
+_NO_DATA_GAP = {'absolute': 0, 'percent': 0, 'status': 'no_data'}
+
+# Strategy insight rules as (predicate, type, render) entries; adding a
+# rule extends the tuple instead of growing an if/elif chain, and the
+# message text is interned at import
+_INSIGHT_RULES = (
+    (
+        lambda c: c.avg_engagement_rate > 5,
+        'high_engagement',
+        lambda c: f'@{c.username} має дуже високу залученість ({c.avg_engagement_rate:.1f}%)',
+    ),
+    (
+        lambda c: (c.posting_frequency or 0) > 1,
+        'high_frequency',
+        lambda c: f'Публікує {c.posting_frequency:.1f} постів на день - активна стратегія',
+    ),
+    (
+        lambda c: 0 < (c.posting_frequency or 0) < 0.5,
+        'low_frequency',
+        lambda c: f'Публікує рідко ({c.posting_frequency:.1f} постів/день) - фокус на якість',
+    ),
+    (
+        lambda c: bool(c.popular_hashtags),
+        'hashtags',
+        lambda c: 'Найпопулярніші хештеги: ' + ', '.join(f'#{tag}' for tag in c.popular_hashtags[:5]),
+    ),
+)
+
+# C-implemented sort keys, built once instead of a lambda per call
+_BY_ENGAGEMENT = itemgetter('avg_engagement_rate')
+_BY_LIKES = itemgetter('avg_likes')
+_BY_COMMENTS = itemgetter('avg_comments')
+_BY_GAP = itemgetter('gap')
+
+# Static recommendation texts, built once at import instead of being
+# re-allocated on every dashboard request
+_MSG_KEEP_STRATEGY = 'Продовжуйте працювати над поточною стратегією'
+
+_RECS_BY_LEVEL = {
+    'Відмінно': (
+        'Чудова робота! Підтримуйте високий рівень якості контенту',
+        'Поділіться своїми успішними практиками з командою',
+    ),
+    'Добре': (
+        'Хороші результати, але є простір для покращення',
+        'Проаналізуйте стратегії лідерів у вашій ніші',
+    ),
+    'Задовільно': (
+        'Потрібно активно працювати над покращенням залученості',
+        'Вивчіть успішні приклади конкурентів',
+        'Експериментуйте з різними типами контенту',
+    ),
+}
+
+_RECS_DEFAULT = (
+    'Необхідна серйозна робота над контент-стратегією',
+    'Дослідіть, що працює у ваших конкурентів',
+    'Отримайте професійну консультацію з SMM',
+)
+
 
 class CompetitorAnalyzer:
     """Analyzer for competitor performance and benchmarking."""
-    
+
     def __init__(self, repository: Optional[Repository] = None):
         """
         Initialize competitor analyzer.
-        
+
         Args:
             repository: Repository instance (creates new one if not provided)
         """
-        self.repository = repository or Repository()
+        self.repository = repository or _get_default_repository()
+        self._compare_cache: Dict[tuple, tuple] = {}
+        self._competitors_cache: Optional[tuple] = None
+
+    def invalidate_cache(self):
+        """Drop cached comparisons; call after competitor data is refreshed."""
+        self._compare_cache.clear()
+        self._competitors_cache = None
+
+    def _competitors_columnar(self):
+        """Columnar competitor snapshot, cached for a short burst window.
+
+        Sibling calls within one request (comparison + benchmark) share
+        a single table fetch instead of each pulling it again.
+        """
+        cached = self._competitors_cache
+        if cached and time.monotonic() - cached[0] < _COMPETITOR_FETCH_TTL:
+            return cached[1]
+
+        cols = self.repository.get_competitors_columnar()
+        self._competitors_cache = (time.monotonic(), cols)
+        return cols
     
     def compare_with_competitors(
-        self, 
+        self,
         days: int = 30,
-        end_date: Optional[datetime] = None
+        end_date: Optional[datetime] = None,
+        include_competitor_list: bool = True
     ) -> Dict[str, Any]:
         """
         Compare own performance with competitors.
-        
+
         Args:
             days: Number of days to analyze
             end_date: End date for analysis
-            
+            include_competitor_list: Include the per-competitor dicts in
+                the result; pass False when only the averages are needed
+
         Returns:
             Dictionary with comparison data
         """
         try:
             end_date = end_date or datetime.utcnow()
             start_date = end_date - timedelta(days=days)
-            
+
+            # Serve a recent comparison from the cache; the minute-truncated
+            # key keeps results stable within a burst of sibling calls
+            cache_key = (
+                days,
+                end_date.replace(second=0, microsecond=0),
+                include_competitor_list,
+            )
+            cached = self._compare_cache.get(cache_key)
+            if cached and time.monotonic() - cached[0] < _COMPARE_CACHE_TTL:
+                return deepcopy(cached[1])
+
             logger.info("Comparing with competitors")
             
-            # Get own metrics
-            posts = self.repository.get_posts_by_date_range(start_date, end_date)
-            
-            if not posts:
-                own_metrics = {
-                    'posts_count': 0,
-                    'avg_engagement_rate': 0,
-                    'avg_likes': 0,
-                    'avg_comments': 0
-                }
-            else:
-                own_metrics = {
-                    'posts_count': len(posts),
-                    'avg_engagement_rate': round(sum(p.engagement_rate for p in posts) / len(posts), 2),
-                    'avg_likes': round(sum(p.likes_count for p in posts) / len(posts), 0),
-                    'avg_comments': round(sum(p.comments_count for p in posts) / len(posts), 0)
-                }
-            
-            # Get competitors data
-            competitors = self.repository.get_all_competitors()
+            # Get own metrics from one SQL aggregate row instead of
+            # fetching and summing every post in the window
+            agg = self.repository.get_posts_aggregate(start_date, end_date)
+            own_metrics = {
+                'posts_count': agg['posts_count'],
+                'avg_engagement_rate': round(agg['avg_engagement_rate'], 2),
+                'avg_likes': round(agg['avg_likes'], 0),
+                'avg_comments': round(agg['avg_comments'], 0)
+            }
             
-            if not competitors:
+            # Get competitors as columnar arrays: no ORM objects, and
+            # every metric lands in a contiguous float64 column
+            cols = self._competitors_columnar()
+
+            if not len(cols):
                 return {
                     'status': 'no_competitors',
                     'message': 'Немає даних про конкурентів',
                     'own_metrics': own_metrics
                 }
-            
-            # Format competitor data
-            competitors_data = []
-            for comp in competitors:
-                competitors_data.append({
-                    'username': comp.username,
-                    'full_name': comp.full_name,
-                    'followers_count': comp.followers_count,
-                    'posts_count': comp.posts_count,
-                    'avg_engagement_rate': round(comp.avg_engagement_rate, 2),
-                    'avg_likes': round(comp.avg_likes, 0),
-                    'avg_comments': round(comp.avg_comments, 0),
-                    'posting_frequency': round(comp.posting_frequency, 1) if comp.posting_frequency else 0,
-                    'last_analyzed': comp.last_analyzed.isoformat() if comp.last_analyzed else None
-                })
-            
-            # Calculate averages across competitors
-            if competitors_data:
-                avg_competitor_engagement = sum(c['avg_engagement_rate'] for c in competitors_data) / len(competitors_data)
-                avg_competitor_likes = sum(c['avg_likes'] for c in competitors_data) / len(competitors_data)
-                avg_competitor_comments = sum(c['avg_comments'] for c in competitors_data) / len(competitors_data)
-                avg_posting_frequency = sum(c['posting_frequency'] for c in competitors_data) / len(competitors_data)
-            else:
-                avg_competitor_engagement = 0
-                avg_competitor_likes = 0
-                avg_competitor_comments = 0
-                avg_posting_frequency = 0
-            
+
+            # Averages become vectorized reductions over the raw columns
             competitor_averages = {
-                'avg_engagement_rate': round(avg_competitor_engagement, 2),
-                'avg_likes': round(avg_competitor_likes, 0),
-                'avg_comments': round(avg_competitor_comments, 0),
-                'avg_posting_frequency': round(avg_posting_frequency, 1)
+                'avg_engagement_rate': round(float(cols.engagement.mean()), 2),
+                'avg_likes': round(float(cols.likes.mean()), 0),
+                'avg_comments': round(float(cols.comments.mean()), 0),
+                'avg_posting_frequency': round(float(cols.posting_freq.mean()), 1)
             }
+
+            # Format competitor data for the response; skipped entirely
+            # when the caller only consumes the averages
+            competitors_data = [] if not include_competitor_list else [
+                {
+                    'username': username,
+                    'full_name': full_name,
+                    'followers_count': int(followers),
+                    'posts_count': int(posts_count),
+                    'avg_engagement_rate': float(engagement),
+                    'avg_likes': float(likes),
+                    'avg_comments': float(comments),
+                    'posting_frequency': float(freq),
+                    'last_analyzed': analyzed
+                }
+                for username, full_name, followers, posts_count,
+                    engagement, likes, comments, freq, analyzed
+                in zip(
+                    cols.usernames, cols.full_names, cols.followers,
+                    cols.posts_counts, cols.engagement, cols.likes,
+                    cols.comments, cols.posting_freq, cols.last_analyzed
+                )
+            ]
             
             # Calculate gaps
             gaps = self._calculate_gaps(own_metrics, competitor_averages)
@@ -110,7 +240,7 @@ class CompetitorAnalyzer:
             # Generate insights
             insights = self._generate_comparison_insights(own_metrics, competitor_averages, gaps)
             
-            return {
+            result = {
                 'status': 'success',
                 'period': {
                     'start': start_date.date().isoformat(),
@@ -123,7 +253,17 @@ class CompetitorAnalyzer:
                 'gaps': gaps,
                 'insights': insights
             }
-            
+            # Evict stale entries on insert: the minute-truncated key
+            # produces a fresh entry per minute in a long-lived process,
+            # so without this the cache grows without bound
+            now = time.monotonic()
+            self._compare_cache = {
+                key: entry for key, entry in self._compare_cache.items()
+                if now - entry[0] < _COMPARE_CACHE_TTL
+            }
+            self._compare_cache[cache_key] = (now, result)
+            return deepcopy(result)
+
         except Exception as e:
             logger.error(f"Error comparing with competitors: {e}")
             return {
@@ -141,11 +281,13 @@ class CompetitorAnalyzer:
         try:
             logger.info("Finding competitor gaps")
             
-            comparison = self.compare_with_competitors(days=30)
-            
+            comparison = self.compare_with_competitors(
+                days=30, include_competitor_list=False
+            )
+
             if comparison['status'] != 'success':
                 return comparison
-            
+
             own = comparison['own_metrics']
             competitors_avg = comparison['competitor_averages']
             
@@ -238,22 +380,28 @@ class CompetitorAnalyzer:
                     'message': 'Немає даних для бенчмаркінгу'
                 }
             
-            # Calculate rankings
-            all_accounts = competitors + [{'username': 'Ви', **own}]
-            
-            # Rank by engagement rate
-            by_engagement = sorted(all_accounts, key=lambda x: x['avg_engagement_rate'], reverse=True)
-            engagement_rank = next(i + 1 for i, acc in enumerate(by_engagement) if acc['username'] == 'Ви')
-            
-            # Rank by likes
-            by_likes = sorted(all_accounts, key=lambda x: x['avg_likes'], reverse=True)
-            likes_rank = next(i + 1 for i, acc in enumerate(by_likes) if acc['username'] == 'Ви')
-            
-            # Rank by comments
-            by_comments = sorted(all_accounts, key=lambda x: x['avg_comments'], reverse=True)
-            comments_rank = next(i + 1 for i, acc in enumerate(by_comments) if acc['username'] == 'Ви')
-            
-            total_accounts = len(all_accounts)
+            # Rank = competitors strictly ahead of us + 1, computed as
+            # vectorized boolean sums over the cached columnar snapshot
+            cols = self._competitors_columnar()
+            engagement_rank = int((cols.engagement > own['avg_engagement_rate']).sum()) + 1
+            likes_rank = int((cols.likes > own['avg_likes']).sum()) + 1
+            comments_rank = int((cols.comments > own['avg_comments']).sum()) + 1
+
+            # Top performers are competitors by definition, so there is
+            # no need to splice our own metrics into the candidate list.
+            # Partition the numeric columns when they line up with the
+            # comparison payload; fall back to the heap if the snapshot
+            # rotated between the two calls.
+            if len(cols) == len(competitors):
+                by_engagement = _top3(cols.engagement, competitors)
+                by_likes = _top3(cols.likes, competitors)
+                by_comments = _top3(cols.comments, competitors)
+            else:
+                by_engagement = heapq.nlargest(3, competitors, key=_BY_ENGAGEMENT)
+                by_likes = heapq.nlargest(3, competitors, key=_BY_LIKES)
+                by_comments = heapq.nlargest(3, competitors, key=_BY_COMMENTS)
+
+            total_accounts = len(competitors) + 1
             
             # Calculate percentile
             engagement_percentile = round((total_accounts - engagement_rank + 1) / total_accounts * 100, 0)
@@ -287,9 +435,9 @@ class CompetitorAnalyzer:
                 },
                 'performance_level': performance_level,
                 'top_performers': {
-                    'by_engagement': by_engagement[:3],
-                    'by_likes': by_likes[:3],
-                    'by_comments': by_comments[:3]
+                    'by_engagement': by_engagement,
+                    'by_likes': by_likes,
+                    'by_comments': by_comments
                 },
                 'recommendations': self._generate_benchmark_recommendations(
                     engagement_rank, 
@@ -335,10 +483,10 @@ class CompetitorAnalyzer:
                 'followers_count': competitor.followers_count,
                 'posts_count': competitor.posts_count,
                 'metrics': {
-                    'avg_engagement_rate': round(competitor.avg_engagement_rate, 2),
-                    'avg_likes': round(competitor.avg_likes, 0),
-                    'avg_comments': round(competitor.avg_comments, 0),
-                    'posting_frequency': round(competitor.posting_frequency, 1) if competitor.posting_frequency else 0
+                    'avg_engagement_rate': competitor.avg_engagement_rate,
+                    'avg_likes': competitor.avg_likes,
+                    'avg_comments': competitor.avg_comments,
+                    'posting_frequency': competitor.posting_frequency or 0.0
                 },
                 'best_posting_times': competitor.best_posting_times or [],
                 'popular_hashtags': competitor.popular_hashtags or [],
@@ -346,37 +494,15 @@ class CompetitorAnalyzer:
                     'post_id': competitor.top_post_id,
                     'engagement': round(competitor.top_post_engagement, 2)
                 } if competitor.top_post_id else None,
-                'last_analyzed': competitor.last_analyzed.isoformat() if competitor.last_analyzed else None
+                'last_analyzed': competitor.last_analyzed_iso
             }
             
-            # Generate strategy insights
-            insights = []
-            
-            if competitor.avg_engagement_rate > 5:
-                insights.append({
-                    'type': 'high_engagement',
-                    'message': f'@{competitor_username} має дуже високу залученість ({competitor.avg_engagement_rate:.1f}%)'
-                })
-            
-            if competitor.posting_frequency and competitor.posting_frequency > 1:
-                insights.append({
-                    'type': 'high_frequency',
-                    'message': f'Публікує {competitor.posting_frequency:.1f} постів на день - активна стратегія'
-                })
-            elif competitor.posting_frequency and competitor.posting_frequency < 0.5:
-                insights.append({
-                    'type': 'low_frequency',
-                    'message': f'Публікує рідко ({competitor.posting_frequency:.1f} постів/день) - фокус на якість'
-                })
-            
-            if competitor.popular_hashtags:
-                top_hashtags = competitor.popular_hashtags[:5]
-                insights.append({
-                    'type': 'hashtags',
-                    'message': f'Найпопулярніші хештеги: {", ".join(f"#{tag}" for tag in top_hashtags)}'
-                })
-            
-            analysis['insights'] = insights
+            # Generate strategy insights from the rule table
+            analysis['insights'] = [
+                {'type': insight_type, 'message': render(competitor)}
+                for predicate, insight_type, render in _INSIGHT_RULES
+                if predicate(competitor)
+            ]
             
             return {
                 'status': 'success',
@@ -399,15 +525,17 @@ class CompetitorAnalyzer:
         """
         try:
             logger.info("Getting all competitors overview")
-            
-            competitors = self.repository.get_all_competitors()
-            
+
+            # Ordering and market aggregates are pushed down to SQL, so
+            # Python only formats rows for the response
+            competitors = self.repository.get_competitors_ranked()
+
             if not competitors:
                 return {
                     'status': 'no_competitors',
                     'message': 'Немає доданих конкурентів для відстеження'
                 }
-            
+
             competitors_list = []
             for comp in competitors:
                 competitors_list.append({
@@ -415,28 +543,23 @@ class CompetitorAnalyzer:
                     'full_name': comp.full_name,
                     'followers_count': comp.followers_count,
                     'posts_count': comp.posts_count,
-                    'avg_engagement_rate': round(comp.avg_engagement_rate, 2),
-                    'avg_likes': round(comp.avg_likes, 0),
-                    'avg_comments': round(comp.avg_comments, 0),
-                    'posting_frequency': round(comp.posting_frequency, 1) if comp.posting_frequency else 0,
-                    'last_analyzed': comp.last_analyzed.isoformat() if comp.last_analyzed else None
+                    'avg_engagement_rate': comp.avg_engagement_rate,
+                    'avg_likes': comp.avg_likes,
+                    'avg_comments': comp.avg_comments,
+                    'posting_frequency': comp.posting_frequency or 0.0,
+                    'last_analyzed': comp.last_analyzed_iso
                 })
-            
-            # Sort by engagement rate
-            competitors_list.sort(key=lambda x: x['avg_engagement_rate'], reverse=True)
-            
-            # Calculate market statistics
-            avg_engagement = sum(c['avg_engagement_rate'] for c in competitors_list) / len(competitors_list)
-            avg_followers = sum(c['followers_count'] for c in competitors_list) / len(competitors_list)
-            
+
+            market = self.repository.get_competitor_market_stats()
+
             return {
                 'status': 'success',
-                'total_competitors': len(competitors_list),
+                'total_competitors': market['total_competitors'],
                 'competitors': competitors_list,
                 'market_stats': {
-                    'avg_engagement_rate': round(avg_engagement, 2),
-                    'avg_followers': int(avg_followers),
-                    'top_engagement': competitors_list[0]['avg_engagement_rate'] if competitors_list else 0
+                    'avg_engagement_rate': round(market['avg_engagement_rate'], 2),
+                    'avg_followers': int(market['avg_followers']),
+                    'top_engagement': round(market['top_engagement'], 2)
                 }
             }
             
@@ -453,28 +576,28 @@ class CompetitorAnalyzer:
         competitor_averages: Dict[str, float]
     ) -> Dict[str, Any]:
         """Calculate performance gaps."""
+        # Degenerate case: nothing to compare against, share the
+        # constant no-data entry instead of building three dicts
+        if not any(competitor_averages.get(m, 0) for m in _GAP_METRICS):
+            return {metric: _NO_DATA_GAP for metric in _GAP_METRICS}
+
         gaps = {}
-        
-        for metric in ['avg_engagement_rate', 'avg_likes', 'avg_comments']:
+        for metric in _GAP_METRICS:
             own_value = own_metrics.get(metric, 0)
             comp_value = competitor_averages.get(metric, 0)
-            
+
             if comp_value > 0:
                 gap_value = comp_value - own_value
                 gap_percent = (gap_value / comp_value) * 100
-                
+
                 gaps[metric] = {
                     'absolute': round(gap_value, 2),
                     'percent': round(gap_percent, 1),
                     'status': 'behind' if gap_value > 0 else 'ahead'
                 }
             else:
-                gaps[metric] = {
-                    'absolute': 0,
-                    'percent': 0,
-                    'status': 'no_data'
-                }
-        
+                gaps[metric] = _NO_DATA_GAP
+
         return gaps
     
     def _generate_comparison_insights(
@@ -520,10 +643,10 @@ class CompetitorAnalyzer:
     def _prioritize_actions(self, opportunities: List[Dict[str, Any]]) -> List[str]:
         """Prioritize actions based on opportunities."""
         if not opportunities:
-            return ['Продовжуйте працювати над поточною стратегією']
+            return [_MSG_KEEP_STRATEGY]
         
         # Sort by gap size
-        sorted_opps = sorted(opportunities, key=lambda x: x.get('gap', 0), reverse=True)
+        sorted_opps = sorted(opportunities, key=_BY_GAP, reverse=True)
         
         actions = []
         for opp in sorted_opps[:3]:  # Top 3 priorities
@@ -538,26 +661,15 @@ class CompetitorAnalyzer:
         performance_level: str
     ) -> List[str]:
         """Generate recommendations based on benchmark."""
-        recommendations = []
-        
-        if performance_level == 'Відмінно':
-            recommendations.append('Чудова робота! Підтримуйте високий рівень якості контенту')
-            recommendations.append('Поділіться своїми успішними практиками з командою')
-        elif performance_level == 'Добре':
-            recommendations.append('Хороші результати, але є простір для покращення')
-            recommendations.append('Проаналізуйте стратегії лідерів у вашій ніші')
-        elif performance_level == 'Задовільно':
-            recommendations.append('Потрібно активно працювати над покращенням залученості')
-            recommendations.append('Вивчіть успішні приклади конкурентів')
-            recommendations.append('Експериментуйте з різними типами контенту')
-        else:
-            recommendations.append('Необхідна серйозна робота над контент-стратегією')
-            recommendations.append('Дослідіть, що працює у ваших конкурентів')
-            recommendations.append('Отримайте професійну консультацію з SMM')
-        
-        return recommendations
+        return list(_RECS_BY_LEVEL.get(performance_level, _RECS_DEFAULT))
     
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def close(self):
-        """Close repository connection."""
-        if self.repository:
+        """Close repository connection (no-op for the shared default)."""
+        if self.repository and self.repository is not _default_repository:
             self.repository.close()
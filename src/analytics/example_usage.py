@@ -6,204 +6,352 @@ This script demonstrates how to use the analytics modules to:
 2. Compare with competitors
 3. Analyze hashtag effectiveness
 """
-from datetime import datetime, timedelta
-from src.analytics import PerformanceAnalyzer, CompetitorAnalyzer, HashtagAnalyzer
+import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from src.analytics import AnalyticsFacade
+from src.analytics._cache import cached
 
+# Section separators built once instead of a str.__mul__ per boundary
+SEP = "-" * 50
+BAR = "=" * 50
 
-def main():
+
+def _section_1_trends(results, out):
+    out("1. Analyzing Performance Trends...")
+    out(SEP)
+
+    trends = results['trends']
+    status = trends['status']
+    if status == 'success':
+        summary = trends['summary']
+        out(f"Total Posts: {summary['total_posts']}")
+        out(f"Avg Engagement Rate: {summary['avg_engagement_rate']}%")
+        out(f"Total Likes: {summary['total_likes']}")
+        out(f"Total Comments: {summary['total_comments']}")
+        out(f"Trend: {trends['trend']['direction']}")
+    else:
+        out(f"Status: {status}")
+
+
+def _section_2_timing(results, out):
+    out("\n2. Finding Best Posting Times...")
+    out(SEP)
+
+    timing = results['timing']
+    status = timing['status']
+    if status == 'success':
+        out("Best Hours:")
+        for hour_data in timing['best_hours'][:3]:
+            out(f"  - {hour_data['hour']:02d}:00 "
+                  f"({hour_data['avg_engagement_rate']}% engagement)")
+
+        out("\nBest Days:")
+        for day_data in timing['best_days']:
+            out(f"  - {day_data['day_name']} "
+                  f"({day_data['avg_engagement_rate']}% engagement)")
+    else:
+        out(f"Status: {status}")
+
+
+def _section_3_content(results, out):
+    out("\n3. Content Type Performance...")
+    out(SEP)
+
+    content = results['content']
+    status = content['status']
+    if status == 'success':
+        for ctype in content['content_types']:
+            out(f"{ctype['type_name']}: "
+                  f"{ctype['avg_engagement_rate']}% engagement "
+                  f"({ctype['count']} posts)")
+    else:
+        out(f"Status: {status}")
+
+
+def _section_4_top_posts(results, out):
+    out("\n4. Top Performing Posts...")
+    out(SEP)
+
+    top_posts = results['top_posts']
+    status = top_posts['status']
+    if status == 'success':
+        for i, post in enumerate(top_posts['top_posts'], 1):
+            out(f"{i}. {post['media_type']} - "
+                  f"{post['engagement_rate']}% engagement")
+            out(f"   Likes: {post['likes_count']}, "
+                  f"Comments: {post['comments_count']}")
+    else:
+        out(f"Status: {status}")
+
+
+def _section_5_comparison(results, out):
+    out("\n\n5. Competitor Comparison...")
+    out(SEP)
+
+    comparison = results['comparison']
+    status = comparison['status']
+    if status == 'success':
+        out("Your Metrics:")
+        own = comparison['own_metrics']
+        out(f"  - Engagement Rate: {own['avg_engagement_rate']}%")
+        out(f"  - Avg Likes: {own['avg_likes']}")
+        out(f"  - Avg Comments: {own['avg_comments']}")
+
+        out("\nCompetitor Averages:")
+        comp_avg = comparison['competitor_averages']
+        out(f"  - Engagement Rate: {comp_avg['avg_engagement_rate']}%")
+        out(f"  - Avg Likes: {comp_avg['avg_likes']}")
+        out(f"  - Avg Comments: {comp_avg['avg_comments']}")
+    else:
+        out(f"Status: {status}")
+
+
+def _section_6_gaps(results, out):
+    out("\n6. Finding Gaps and Opportunities...")
+    out(SEP)
+
+    gaps = results['gaps']
+    status = gaps['status']
+    if status == 'success':
+        if gaps.get('opportunities'):
+            out("Opportunities for Improvement:")
+            for opp in gaps['opportunities']:
+                out(f"  - {opp['metric']}: {opp['recommendation']}")
+
+        if gaps.get('strengths'):
+            out("\nYour Strengths:")
+            for strength in gaps['strengths']:
+                out(f"  - {strength['message']}")
+    else:
+        out(f"Status: {status}")
+
+
+def _section_7_benchmark(results, out):
+    out("\n7. Performance Benchmarking...")
+    out(SEP)
+
+    benchmark = results['benchmark']
+    status = benchmark['status']
+    if status == 'success':
+        rankings = benchmark['rankings']
+        out(f"Performance Level: {benchmark['performance_level']}")
+        out(f"Engagement Rank: {rankings['engagement']['rank']} "
+              f"of {rankings['engagement']['total']} "
+              f"({rankings['engagement']['percentile']}th percentile)")
+    else:
+        out(f"Status: {status}")
+
+
+def _section_8_effectiveness(results, out):
+    out("\n\n8. Hashtag Effectiveness...")
+    out(SEP)
+
+    hashtag_analysis = results['hashtag_analysis']
+    status = hashtag_analysis['status']
+    if status == 'success':
+        out(f"Total Unique Hashtags: {hashtag_analysis['total_unique_hashtags']}")
+
+        high_performers = hashtag_analysis['high_performers']
+        if high_performers:
+            out("\nHigh Performing Hashtags:")
+            for tag_data in high_performers[:5]:
+                out(f"  - #{tag_data['tag']}: "
+                      f"{tag_data['avg_engagement_rate']}% engagement "
+                      f"({tag_data['usage_count']} uses)")
+    else:
+        out(f"Status: {status}")
+
+
+def _section_9_trending(results, out):
+    out("\n9. Trending Hashtags...")
+    out(SEP)
+
+    trending = results['trending']
+    status = trending['status']
+    if status == 'success' and trending['trending_hashtags']:
+        for tag_data in trending['trending_hashtags'][:5]:
+            out(f"  - #{tag_data['tag']}: "
+                  f"{tag_data['avg_engagement_rate']}% engagement")
+    else:
+        out(f"Status: {status}")
+
+
+def _section_10_recommendations(results, out):
+    out("\n10. Hashtag Recommendations...")
+    out(SEP)
+
+    recommendations = results['recommendations']
+    status = recommendations['status']
+    if status == 'success':
+        out("Recommended Hashtags:")
+        for rec in recommendations['recommendations'][:5]:
+            out(f"  - #{rec['tag']}: Score {rec['score']} "
+                  f"({rec['reason']})")
+    else:
+        out(f"Status: {status}")
+
+
+def _section_11_patterns(results, out):
+    out("\n11. Hashtag Usage Patterns...")
+    out(SEP)
+
+    patterns = results['patterns']
+    status = patterns['status']
+    if status == 'success':
+        stats = patterns['statistics']
+        out(f"Avg Hashtags per Post: {stats['avg_hashtags_per_post']}")
+        out(f"Unique Hashtags Used: {stats['unique_hashtags']}")
+
+        if patterns.get('optimal_count'):
+            optimal = patterns['optimal_count']
+            out(f"Optimal Count Range: {optimal['hashtag_count_range']} "
+                  f"({optimal['avg_engagement_rate']}% engagement)")
+    else:
+        out(f"Status: {status}")
+
+
+def _section_12_insights(results, out):
+    out("\n12. Getting Comprehensive Insights...")
+    out(SEP)
+
+    insights = results['insights']
+    status = insights['status']
+    if status == 'success' and insights.get('insights'):
+        out("Key Insights:")
+        for insight in insights['insights']:
+            out(f"  [{insight['type'].upper()}] {insight['title']}")
+            out(f"    {insight['message']}")
+    else:
+        out(f"Status: {status}")
+
+
+# Each demo section with the analyzer group whose results feed it;
+# section 12 rides in the performance bundle but renders last
+SECTIONS = {
+    1: ('performance', _section_1_trends),
+    2: ('performance', _section_2_timing),
+    3: ('performance', _section_3_content),
+    4: ('performance', _section_4_top_posts),
+    5: ('competitors', _section_5_comparison),
+    6: ('competitors', _section_6_gaps),
+    7: ('competitors', _section_7_benchmark),
+    8: ('hashtags', _section_8_effectiveness),
+    9: ('hashtags', _section_9_trending),
+    10: ('hashtags', _section_10_recommendations),
+    11: ('hashtags', _section_11_patterns),
+    12: ('performance', _section_12_insights),
+}
+
+_GROUP_ORDER = ('performance', 'competitors', 'hashtags')
+
+
+def _parse_only(value: str):
+    """Parse --only=1,4,8 into a set of section numbers."""
+    try:
+        selected = {int(part) for part in value.split(',') if part.strip()}
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a comma-separated list of numbers: {value!r}")
+
+    unknown = selected - SECTIONS.keys()
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown sections: {sorted(unknown)} (valid: 1-{len(SECTIONS)})"
+        )
+    return selected
+
+
+def main(argv=None):
     """Main function to demonstrate analytics usage."""
-    
+
+    parser = argparse.ArgumentParser(description='Instagram SMM analytics demo.')
+    parser.add_argument(
+        '--only', type=_parse_only, default=None, metavar='1,4,8',
+        help='comma-separated section numbers to run (default: all)'
+    )
+    args = parser.parse_args(argv)
+    selected = sorted(args.only) if args.only else sorted(SECTIONS)
+
+    # Only the analyzer groups feeding a selected section run at all,
+    # so --only=N skips the other groups' queries entirely
+    needed = [
+        group for group in _GROUP_ORDER
+        if any(SECTIONS[num][0] == group for num in selected)
+    ]
+
     print("=== Instagram SMM Analytics Demo ===\n")
-    
-    # Initialize analyzers
-    performance = PerformanceAnalyzer()
-    competitors = CompetitorAnalyzer()
-    hashtags = HashtagAnalyzer()
-    
+
+    # One facade instead of three standalone analyzers: sub-analyzers
+    # are built lazily inside the runners, and the facade's single
+    # close() releases only what was actually used
+    an = AnalyticsFacade()
+
+    # Memoize each analysis for five minutes: re-running the demo in
+    # the same process turns every section into a dict lookup
+    memo = cached(ttl=300)
+
+    # One worker per analyzer: DB sessions are not thread-safe, so each
+    # analyzer's calls stay on its own thread while the three groups of
+    # queries overlap instead of running strictly one after another
+    def run_performance():
+        # One bundle over shared post windows instead of five
+        # independent fetch-and-aggregate passes
+        return memo(an.performance.bulk_compute)(days=30, timing_days=90)
+
+    def run_competitors():
+        return {
+            'comparison': memo(an.competitors.compare_with_competitors)(days=30),
+            'gaps': memo(an.competitors.find_competitor_gaps)(),
+            'benchmark': memo(an.competitors.benchmark_performance)(),
+        }
+
+    def run_hashtags():
+        return {
+            'hashtag_analysis': memo(an.hashtags.analyze_hashtag_effectiveness)(days=30),
+            'trending': memo(an.hashtags.get_trending_hashtags)(limit=10),
+            'recommendations': memo(an.hashtags.recommend_hashtags)(count=10),
+            'patterns': memo(an.hashtags.get_hashtag_usage_patterns)(days=90),
+        }
+
+    runners = {
+        'performance': run_performance,
+        'competitors': run_competitors,
+        'hashtags': run_hashtags,
+    }
+
+    # Buffer section output and flush one write per group: a handful of
+    # stdout syscalls instead of ~60 individual print calls
+    buf = []
+    out = buf.append
+
+    def flush():
+        if buf:
+            sys.stdout.write("\n".join(buf) + "\n")
+            buf.clear()
+
+    results = {}
     try:
-        # 1. Performance Analysis
-        print("1. Analyzing Performance Trends...")
-        print("-" * 50)
-        
-        trends = performance.analyze_engagement_trends(days=30)
-        if trends['status'] == 'success':
-            summary = trends['summary']
-            print(f"Total Posts: {summary['total_posts']}")
-            print(f"Avg Engagement Rate: {summary['avg_engagement_rate']}%")
-            print(f"Total Likes: {summary['total_likes']}")
-            print(f"Total Comments: {summary['total_comments']}")
-            print(f"Trend: {trends['trend']['direction']}")
-        else:
-            print(f"Status: {trends['status']}")
-        
-        print("\n2. Finding Best Posting Times...")
-        print("-" * 50)
-        
-        timing = performance.find_best_posting_times(days=90)
-        if timing['status'] == 'success':
-            print("Best Hours:")
-            for hour_data in timing['best_hours'][:3]:
-                print(f"  - {hour_data['hour']:02d}:00 "
-                      f"({hour_data['avg_engagement_rate']}% engagement)")
-            
-            print("\nBest Days:")
-            for day_data in timing['best_days']:
-                print(f"  - {day_data['day_name']} "
-                      f"({day_data['avg_engagement_rate']}% engagement)")
-        else:
-            print(f"Status: {timing['status']}")
-        
-        print("\n3. Content Type Performance...")
-        print("-" * 50)
-        
-        content = performance.analyze_content_type_performance(days=30)
-        if content['status'] == 'success':
-            for ctype in content['content_types']:
-                print(f"{ctype['type_name']}: "
-                      f"{ctype['avg_engagement_rate']}% engagement "
-                      f"({ctype['count']} posts)")
-        else:
-            print(f"Status: {content['status']}")
-        
-        print("\n4. Top Performing Posts...")
-        print("-" * 50)
-        
-        top_posts = performance.get_top_performing_posts(limit=5, days=30)
-        if top_posts['status'] == 'success':
-            for i, post in enumerate(top_posts['top_posts'], 1):
-                print(f"{i}. {post['media_type']} - "
-                      f"{post['engagement_rate']}% engagement")
-                print(f"   Likes: {post['likes_count']}, "
-                      f"Comments: {post['comments_count']}")
-        else:
-            print(f"Status: {top_posts['status']}")
-        
-        # 2. Competitor Analysis
-        print("\n\n5. Competitor Comparison...")
-        print("-" * 50)
-        
-        comparison = competitors.compare_with_competitors(days=30)
-        if comparison['status'] == 'success':
-            print("Your Metrics:")
-            own = comparison['own_metrics']
-            print(f"  - Engagement Rate: {own['avg_engagement_rate']}%")
-            print(f"  - Avg Likes: {own['avg_likes']}")
-            print(f"  - Avg Comments: {own['avg_comments']}")
-            
-            print("\nCompetitor Averages:")
-            comp_avg = comparison['competitor_averages']
-            print(f"  - Engagement Rate: {comp_avg['avg_engagement_rate']}%")
-            print(f"  - Avg Likes: {comp_avg['avg_likes']}")
-            print(f"  - Avg Comments: {comp_avg['avg_comments']}")
-        else:
-            print(f"Status: {comparison['status']}")
-        
-        print("\n6. Finding Gaps and Opportunities...")
-        print("-" * 50)
-        
-        gaps = competitors.find_competitor_gaps()
-        if gaps['status'] == 'success':
-            if gaps.get('opportunities'):
-                print("Opportunities for Improvement:")
-                for opp in gaps['opportunities']:
-                    print(f"  - {opp['metric']}: {opp['recommendation']}")
-            
-            if gaps.get('strengths'):
-                print("\nYour Strengths:")
-                for strength in gaps['strengths']:
-                    print(f"  - {strength['message']}")
-        else:
-            print(f"Status: {gaps['status']}")
-        
-        print("\n7. Performance Benchmarking...")
-        print("-" * 50)
-        
-        benchmark = competitors.benchmark_performance()
-        if benchmark['status'] == 'success':
-            rankings = benchmark['rankings']
-            print(f"Performance Level: {benchmark['performance_level']}")
-            print(f"Engagement Rank: {rankings['engagement']['rank']} "
-                  f"of {rankings['engagement']['total']} "
-                  f"({rankings['engagement']['percentile']}th percentile)")
-        else:
-            print(f"Status: {benchmark['status']}")
-        
-        # 3. Hashtag Analysis
-        print("\n\n8. Hashtag Effectiveness...")
-        print("-" * 50)
-        
-        hashtag_analysis = hashtags.analyze_hashtag_effectiveness(days=30)
-        if hashtag_analysis['status'] == 'success':
-            print(f"Total Unique Hashtags: {hashtag_analysis['total_unique_hashtags']}")
-            
-            high_performers = hashtag_analysis['high_performers']
-            if high_performers:
-                print("\nHigh Performing Hashtags:")
-                for tag_data in high_performers[:5]:
-                    print(f"  - #{tag_data['tag']}: "
-                          f"{tag_data['avg_engagement_rate']}% engagement "
-                          f"({tag_data['usage_count']} uses)")
-        else:
-            print(f"Status: {hashtag_analysis['status']}")
-        
-        print("\n9. Trending Hashtags...")
-        print("-" * 50)
-        
-        trending = hashtags.get_trending_hashtags(limit=10)
-        if trending['status'] == 'success' and trending['trending_hashtags']:
-            for tag_data in trending['trending_hashtags'][:5]:
-                print(f"  - #{tag_data['tag']}: "
-                      f"{tag_data['avg_engagement_rate']}% engagement")
-        else:
-            print(f"Status: {trending['status']}")
-        
-        print("\n10. Hashtag Recommendations...")
-        print("-" * 50)
-        
-        recommendations = hashtags.recommend_hashtags(count=10)
-        if recommendations['status'] == 'success':
-            print("Recommended Hashtags:")
-            for rec in recommendations['recommendations'][:5]:
-                print(f"  - #{rec['tag']}: Score {rec['score']} "
-                      f"({rec['reason']})")
-        else:
-            print(f"Status: {recommendations['status']}")
-        
-        print("\n11. Hashtag Usage Patterns...")
-        print("-" * 50)
-        
-        patterns = hashtags.get_hashtag_usage_patterns(days=90)
-        if patterns['status'] == 'success':
-            stats = patterns['statistics']
-            print(f"Avg Hashtags per Post: {stats['avg_hashtags_per_post']}")
-            print(f"Unique Hashtags Used: {stats['unique_hashtags']}")
-            
-            if patterns.get('optimal_count'):
-                optimal = patterns['optimal_count']
-                print(f"Optimal Count Range: {optimal['hashtag_count_range']} "
-                      f"({optimal['avg_engagement_rate']}% engagement)")
-        else:
-            print(f"Status: {patterns['status']}")
-        
-        print("\n12. Getting Comprehensive Insights...")
-        print("-" * 50)
-        
-        insights = performance.get_performance_insights(days=30)
-        if insights['status'] == 'success' and insights.get('insights'):
-            print("Key Insights:")
-            for insight in insights['insights']:
-                print(f"  [{insight['type'].upper()}] {insight['title']}")
-                print(f"    {insight['message']}")
-        else:
-            print(f"Status: {insights['status']}")
-        
+        with ThreadPoolExecutor(max_workers=len(needed)) as executor:
+            futures = {group: executor.submit(runners[group]) for group in needed}
+            # Stream each group as its future resolves: sections print
+            # while the remaining analyzers' queries are still in flight
+            for group in needed:
+                results.update(futures[group].result())
+                for num in selected:
+                    if num != 12 and SECTIONS[num][0] == group:
+                        SECTIONS[num][1](results, out)
+                flush()
+
+        if 12 in selected:
+            _section_12_insights(results, out)
     finally:
+        # Flush whatever was produced, even on a failed section
+        flush()
+
         # Close connections
-        performance.close()
-        competitors.close()
-        hashtags.close()
-    
-    print("\n" + "=" * 50)
+        an.close()
+
+    print("\n" + BAR)
     print("Analytics demo completed!")
 
 
@@ -0,0 +1,62 @@
+"""Single entry point over the analytics sub-analyzers."""
+from typing import Optional
+from src.database.repository import Repository
+from src.analytics.performance import PerformanceAnalyzer
+from src.analytics.competitors import CompetitorAnalyzer
+from src.analytics.hashtags import HashtagAnalyzer
+
+
+class AnalyticsFacade:
+    """Lazily instantiated analyzers behind one object.
+
+    Sub-analyzers are only constructed on first access, so a caller
+    that touches a single analysis pays for one session instead of
+    three, and close() releases only what was actually used.
+    """
+
+    def __init__(self, repository: Optional[Repository] = None):
+        """
+        Initialize the facade.
+
+        Args:
+            repository: Repository passed to every sub-analyzer. Leave
+                as None when analyzers run on separate threads — their
+                sessions are not thread-safe to share.
+        """
+        self._repository = repository
+        self._performance: Optional[PerformanceAnalyzer] = None
+        self._competitors: Optional[CompetitorAnalyzer] = None
+        self._hashtags: Optional[HashtagAnalyzer] = None
+
+    @property
+    def performance(self) -> PerformanceAnalyzer:
+        """Performance analyzer, created on first access."""
+        if self._performance is None:
+            self._performance = PerformanceAnalyzer(self._repository)
+        return self._performance
+
+    @property
+    def competitors(self) -> CompetitorAnalyzer:
+        """Competitor analyzer, created on first access."""
+        if self._competitors is None:
+            self._competitors = CompetitorAnalyzer(self._repository)
+        return self._competitors
+
+    @property
+    def hashtags(self) -> HashtagAnalyzer:
+        """Hashtag analyzer, created on first access."""
+        if self._hashtags is None:
+            self._hashtags = HashtagAnalyzer(self._repository)
+        return self._hashtags
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close only the analyzers that were instantiated."""
+        for analyzer in (self._performance, self._competitors, self._hashtags):
+            if analyzer is not None:
+                analyzer.close()
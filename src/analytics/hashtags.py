@@ -1,7 +1,12 @@
 """Hashtag analytics and recommendations."""
+import heapq
+import time
+from bisect import bisect_right
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Set
-from collections import defaultdict, Counter
+from collections import Counter
+from itertools import chain
+from operator import itemgetter
 from src.database.repository import Repository
 from src.database.models import Hashtag, Post
 from config.settings import settings
@@ -9,19 +14,107 @@ from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# How long a fetched post window is shared between analyses; the
+# hashtag scans all walk the same recent posts, so sibling calls reuse
+# one SELECT instead of re-reading the table per method
+_POSTS_WINDOW_TTL = 30
+
+# How long top/trending hashtag rows are served from memory; repeated
+# recommendation calls (a bot hot path) reuse one ORDER BY + LIMIT
+# query for data that only shifts on a minute scale
+_HASHTAG_FETCH_TTL = 60
+
+# Result keys for the per-tag effectiveness rows, hashed once here
+# instead of once per key per tag in the reporting loop
+_EFFECTIVENESS_KEYS = (
+    'tag', 'usage_count', 'avg_likes', 'avg_comments', 'avg_reach',
+    'avg_engagement_rate', 'effectiveness_score', 'best_engagement',
+    'worst_engagement', 'consistency'
+)
+
+
+def _clean_tag(tag: str) -> str:
+    """Lowercase a tag without its leading '#'.
+
+    A slice on a single startswith check skips the char-set scan that
+    lstrip('#') performs per call.
+    """
+    return (tag[1:] if tag.startswith('#') else tag).lower()
+
 
 class HashtagAnalyzer:
     """Analyzer for hashtag performance and recommendations."""
-    
+
     def __init__(self, repository: Optional[Repository] = None):
         """
         Initialize hashtag analyzer.
-        
+
         Args:
             repository: Repository instance (creates new one if not provided)
         """
         self.repository = repository or Repository()
-    
+        self._window_cache: Dict[tuple, tuple] = {}
+        self._fetch_cache: Dict[tuple, tuple] = {}
+
+    def invalidate_cache(self):
+        """Drop cached windows and hashtag rows after new data arrives."""
+        self._window_cache.clear()
+        self._fetch_cache.clear()
+
+    def _cached_fetch(self, kind: str, limit: int, fetch) -> List[Hashtag]:
+        """Hashtag rows for (kind, limit), served from memory within the TTL."""
+        key = (kind, limit)
+        hit = self._fetch_cache.get(key)
+        if hit and time.monotonic() - hit[0] < _HASHTAG_FETCH_TTL:
+            return hit[1]
+
+        rows = fetch(limit)
+        self._fetch_cache[key] = (time.monotonic(), rows)
+        return rows
+
+    def _get_posts_window(self, start_date: datetime, end_date: datetime) -> List[Post]:
+        """Posts for a date window, shared across sibling analyses."""
+        key = (start_date.date(), end_date.date())
+        hit = self._window_cache.get(key)
+        if hit and time.monotonic() - hit[0] < _POSTS_WINDOW_TTL:
+            return hit[1]
+
+        posts = self.repository.get_posts_by_date_range(start_date, end_date)
+        self._window_cache[key] = (time.monotonic(), posts)
+        return posts
+
+    def analyze_all(
+        self,
+        days: int = 30,
+        end_date: Optional[datetime] = None,
+        min_usage: int = 2,
+        min_pair_posts: int = 3
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Run effectiveness and combination analysis as one bundle.
+
+        Dashboards typically want both; bundling them costs one SQL
+        aggregate query (effectiveness) plus one post fetch that the
+        window cache would otherwise repay only within its TTL.
+
+        Args:
+            days: Number of days to analyze
+            end_date: End date for analysis
+            min_usage: Minimum usage count for effectiveness
+            min_pair_posts: Minimum posts for a combination
+
+        Returns:
+            Dictionary with effectiveness/combinations results
+        """
+        return {
+            'effectiveness': self.analyze_hashtag_effectiveness(
+                days=days, end_date=end_date, min_usage=min_usage
+            ),
+            'combinations': self.analyze_hashtag_combinations(
+                days=days, end_date=end_date, min_posts=min_pair_posts
+            ),
+        }
+
     def analyze_hashtag_effectiveness(
         self,
         days: int = 30,
@@ -44,86 +137,93 @@ class HashtagAnalyzer:
             start_date = end_date - timedelta(days=days)
             
             logger.info(f"Analyzing hashtag effectiveness from {start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}")
-            
-            # Get posts in date range
-            posts = self.repository.get_posts_by_date_range(start_date, end_date)
-            
-            if not posts:
+
+            # Per-tag sums and extremes grouped inside SQLite: only one
+            # row per distinct raw tag crosses the wire, no Post rows
+            rows = self.repository.get_hashtag_aggregates(start_date, end_date)
+
+            if not rows and self.repository.get_posts_aggregate(
+                start_date, end_date
+            )['posts_count'] == 0:
                 return {
                     'status': 'no_data',
                     'message': 'Немає даних для аналізу'
                 }
-            
-            # Collect hashtag statistics
-            hashtag_stats = defaultdict(lambda: {
-                'usage_count': 0,
-                'total_likes': 0,
-                'total_comments': 0,
-                'total_reach': 0,
-                'total_engagement': 0,
-                'posts': []
-            })
-            
-            for post in posts:
-                if not post.hashtags:
-                    continue
-                
-                hashtags = post.hashtags if isinstance(post.hashtags, list) else []
-                
-                for tag in hashtags:
-                    # Clean hashtag
-                    clean_tag = tag.lstrip('#').lower()
-                    
-                    hashtag_stats[clean_tag]['usage_count'] += 1
-                    hashtag_stats[clean_tag]['total_likes'] += post.likes_count
-                    hashtag_stats[clean_tag]['total_comments'] += post.comments_count
-                    hashtag_stats[clean_tag]['total_reach'] += post.reach
-                    hashtag_stats[clean_tag]['total_engagement'] += post.engagement_rate
-                    hashtag_stats[clean_tag]['posts'].append(post)
-            
+
+            # Normalize tags in Python (SQLite's lower() is ASCII-only
+            # and would leave Cyrillic tags uncased) and merge raw
+            # variants like '#Tag'/'tag' onto one key — a cheap pass,
+            # since it runs over per-tag rows rather than posts
+            merged: Dict[str, Dict[str, Any]] = {}
+            for row in rows:
+                tag = _clean_tag(row['tag'])
+                agg = merged.get(tag)
+                if agg is None:
+                    merged[tag] = {
+                        'usage_count': row['usage_count'],
+                        'total_likes': row['total_likes'] or 0,
+                        'total_comments': row['total_comments'] or 0,
+                        'total_reach': row['total_reach'] or 0,
+                        'total_engagement': row['total_engagement'] or 0.0,
+                        'best': row['best_engagement'] or 0.0,
+                        'worst': row['worst_engagement'] or 0.0,
+                    }
+                else:
+                    agg['usage_count'] += row['usage_count']
+                    agg['total_likes'] += row['total_likes'] or 0
+                    agg['total_comments'] += row['total_comments'] or 0
+                    agg['total_reach'] += row['total_reach'] or 0
+                    agg['total_engagement'] += row['total_engagement'] or 0.0
+                    agg['best'] = max(agg['best'], row['best_engagement'] or 0.0)
+                    agg['worst'] = min(agg['worst'], row['worst_engagement'] or 0.0)
+
             # Calculate effectiveness metrics
             hashtags_analysis = []
-            
-            for tag, stats in hashtag_stats.items():
-                usage = stats['usage_count']
-                
+
+            for tag, agg in merged.items():
+                usage = agg['usage_count']
+
                 # Skip if below minimum usage
                 if usage < min_usage:
                     continue
-                
-                avg_likes = stats['total_likes'] / usage
-                avg_comments = stats['total_comments'] / usage
-                avg_reach = stats['total_reach'] / usage if stats['total_reach'] > 0 else 0
-                avg_engagement = stats['total_engagement'] / usage
-                
+
+                avg_likes = agg['total_likes'] / usage
+                avg_comments = agg['total_comments'] / usage
+                avg_reach = agg['total_reach'] / usage if agg['total_reach'] > 0 else 0
+                avg_engagement = agg['total_engagement'] / usage
+
                 # Calculate effectiveness score (0-100)
                 effectiveness_score = min(100, (avg_engagement * 10))
-                
-                # Get best and worst posts
-                posts_list = stats['posts']
-                best_post = max(posts_list, key=lambda p: p.engagement_rate)
-                worst_post = min(posts_list, key=lambda p: p.engagement_rate)
-                
-                hashtags_analysis.append({
-                    'tag': tag,
-                    'usage_count': usage,
-                    'avg_likes': round(avg_likes, 0),
-                    'avg_comments': round(avg_comments, 1),
-                    'avg_reach': round(avg_reach, 0),
-                    'avg_engagement_rate': round(avg_engagement, 2),
-                    'effectiveness_score': round(effectiveness_score, 1),
-                    'best_engagement': round(best_post.engagement_rate, 2),
-                    'worst_engagement': round(worst_post.engagement_rate, 2),
-                    'consistency': round((worst_post.engagement_rate / best_post.engagement_rate * 100) if best_post.engagement_rate > 0 else 0, 1)
-                })
+
+                best = agg['best']
+                worst = agg['worst']
+
+                hashtags_analysis.append(dict(zip(_EFFECTIVENESS_KEYS, (
+                    tag,
+                    usage,
+                    round(avg_likes, 0),
+                    round(avg_comments, 1),
+                    round(avg_reach, 0),
+                    round(avg_engagement, 2),
+                    round(effectiveness_score, 1),
+                    round(best, 2),
+                    round(worst, 2),
+                    round((worst / best * 100) if best > 0 else 0, 1)
+                ))))
             
             # Sort by effectiveness score
-            hashtags_analysis.sort(key=lambda x: x['effectiveness_score'], reverse=True)
-            
-            # Categorize hashtags
-            high_performers = [h for h in hashtags_analysis if h['effectiveness_score'] >= 50]
-            medium_performers = [h for h in hashtags_analysis if 30 <= h['effectiveness_score'] < 50]
-            low_performers = [h for h in hashtags_analysis if h['effectiveness_score'] < 30]
+            hashtags_analysis.sort(key=itemgetter('effectiveness_score'), reverse=True)
+
+            # Categorize by slicing the sorted list at the 50/30 cut
+            # points: two binary searches over negated scores replace
+            # three linear filtering passes (bisect_right keeps a tag
+            # scoring exactly 50 or 30 in the higher band)
+            neg_scores = [-h['effectiveness_score'] for h in hashtags_analysis]
+            high_end = bisect_right(neg_scores, -50.0)
+            medium_end = bisect_right(neg_scores, -30.0)
+            high_performers = hashtags_analysis[:high_end]
+            medium_performers = hashtags_analysis[high_end:medium_end]
+            low_performers = hashtags_analysis[medium_end:]
             
             return {
                 'status': 'success',
@@ -166,11 +266,11 @@ class HashtagAnalyzer:
         try:
             logger.info("Getting trending hashtags")
             
-            trending = self.repository.get_trending_hashtags(limit)
-            
+            trending = self._cached_fetch('trending', limit, self.repository.get_trending_hashtags)
+
             if not trending:
                 # Fall back to top performing
-                trending = self.repository.get_top_hashtags(limit)
+                trending = self._cached_fetch('top', limit, self.repository.get_top_hashtags)
             
             hashtags_list = []
             for hashtag in trending:
@@ -219,10 +319,10 @@ class HashtagAnalyzer:
         try:
             logger.info(f"Generating {count} hashtag recommendations")
             
-            exclude_set = set(tag.lstrip('#').lower() for tag in (exclude_tags or []))
+            exclude_set = set(_clean_tag(tag) for tag in (exclude_tags or []))
             
             # Get top performing hashtags
-            top_hashtags = self.repository.get_top_hashtags(limit=50)
+            top_hashtags = self._cached_fetch('top', 50, self.repository.get_top_hashtags)
             
             if not top_hashtags:
                 return {
@@ -230,16 +330,31 @@ class HashtagAnalyzer:
                     'message': 'Недостатньо даних для рекомендацій'
                 }
             
-            # Filter and score hashtags
+            import numpy as np
+
+            # Score every candidate in one vectorized 0-100 pass:
+            # engagement (40%), usage capped at 20, trending +20,
+            # reach/100 capped at 20; result dicts and reasons are
+            # built only for the selected top-count
+            candidates = [h for h in top_hashtags if h.tag.lower() not in exclude_set]
+            n = len(candidates)
+            er = np.fromiter((h.avg_engagement_rate for h in candidates), dtype=np.float64, count=n)
+            usage = np.fromiter((h.usage_count for h in candidates), dtype=np.float64, count=n)
+            reach = np.fromiter((h.avg_reach for h in candidates), dtype=np.float64, count=n)
+            trending = np.fromiter((h.is_trending for h in candidates), dtype=np.float64, count=n)
+            scores = np.minimum(
+                100.0,
+                er * 4
+                + np.minimum(20.0, usage * 2)
+                + trending * 20
+                + np.minimum(20.0, reach / 100)
+            )
+
+            order = np.argsort(-scores, kind='stable')[:count]
             recommendations = []
-            
-            for hashtag in top_hashtags:
-                if hashtag.tag.lower() in exclude_set:
-                    continue
-                
-                # Calculate recommendation score
-                score = self._calculate_recommendation_score(hashtag)
-                
+            for idx in order:
+                hashtag = candidates[idx]
+                score = float(scores[idx])
                 recommendations.append({
                     'tag': hashtag.tag,
                     'score': round(score, 1),
@@ -250,10 +365,6 @@ class HashtagAnalyzer:
                     'reason': self._get_recommendation_reason(hashtag, score)
                 })
             
-            # Sort by score and limit
-            recommendations.sort(key=lambda x: x['score'], reverse=True)
-            recommendations = recommendations[:count]
-            
             # Group by category
             categorized = self._categorize_recommendations(recommendations)
             
@@ -294,7 +405,7 @@ class HashtagAnalyzer:
             
             logger.info("Analyzing hashtag combinations")
             
-            posts = self.repository.get_posts_by_date_range(start_date, end_date)
+            posts = self._get_posts_window(start_date, end_date)
             
             if not posts:
                 return {
@@ -302,48 +413,65 @@ class HashtagAnalyzer:
                     'message': 'Немає даних для аналізу'
                 }
             
-            # Find common pairs
-            pair_stats = defaultdict(lambda: {
-                'count': 0,
-                'total_engagement': 0,
-                'posts': []
-            })
-            
+            import numpy as np
+
+            # Intern tags to integer ids, emit each post's pairs as
+            # packed int64 keys (lo << 32 | hi), then group the packed
+            # keys once — the quadratic pair expansion and the counting
+            # both run inside NumPy instead of nested Python loops
+            tag_to_id: Dict[str, int] = {}
+            key_chunks = []
+            pair_counts = []
+            engagements = []
             for post in posts:
-                if not post.hashtags or len(post.hashtags) < 2:
+                tags = post.hashtags_clean
+                if len(tags) < 2:
                     continue
-                
-                hashtags = [tag.lstrip('#').lower() for tag in post.hashtags]
-                
-                # Generate all pairs
-                for i in range(len(hashtags)):
-                    for j in range(i + 1, len(hashtags)):
-                        pair = tuple(sorted([hashtags[i], hashtags[j]]))
-                        pair_stats[pair]['count'] += 1
-                        pair_stats[pair]['total_engagement'] += post.engagement_rate
-                        pair_stats[pair]['posts'].append(post)
-            
+
+                ids = np.fromiter(
+                    (tag_to_id.setdefault(tag, len(tag_to_id)) for tag in tags),
+                    dtype=np.int64,
+                    count=len(tags)
+                )
+                i, j = np.triu_indices(len(ids), k=1)
+                lo = np.minimum(ids[i], ids[j])
+                hi = np.maximum(ids[i], ids[j])
+                key_chunks.append((lo << 32) | hi)
+                pair_counts.append(len(lo))
+                engagements.append(post.engagement_rate)
+
+            if key_chunks:
+                keys = np.concatenate(key_chunks)
+                weights = np.repeat(
+                    np.asarray(engagements, dtype=np.float64),
+                    np.asarray(pair_counts, dtype=np.intp)
+                )
+                uniq_keys, inverse = np.unique(keys, return_inverse=True)
+                counts = np.bincount(inverse)
+                engagement_sums = np.bincount(inverse, weights=weights)
+            else:
+                uniq_keys = counts = engagement_sums = np.empty(0)
+
             # Calculate metrics for pairs
+            id_to_tag = list(tag_to_id)
             combinations = []
-            
-            for pair, stats in pair_stats.items():
-                if stats['count'] < min_posts:
-                    continue
-                
-                avg_engagement = stats['total_engagement'] / stats['count']
-                
+
+            for idx in np.nonzero(counts >= min_posts)[0]:
+                key = int(uniq_keys[idx])
+                pair = tuple(sorted((id_to_tag[key >> 32], id_to_tag[key & 0xFFFFFFFF])))
+                avg_engagement = engagement_sums[idx] / counts[idx]
+
                 combinations.append({
                     'hashtags': list(pair),
-                    'usage_count': stats['count'],
-                    'avg_engagement_rate': round(avg_engagement, 2),
+                    'usage_count': int(counts[idx]),
+                    'avg_engagement_rate': round(float(avg_engagement), 2),
                     'display': f"#{pair[0]} + #{pair[1]}"
                 })
             
-            # Sort by engagement
-            combinations.sort(key=lambda x: x['avg_engagement_rate'], reverse=True)
-            
-            # Get top combinations
-            top_combinations = combinations[:10]
+            # Bounded-heap top 10: O(N log 10) instead of sorting every pair
+            top_combinations = heapq.nlargest(
+                10, combinations, key=itemgetter('avg_engagement_rate')
+            )
             
             return {
                 'status': 'success',
@@ -385,7 +513,7 @@ class HashtagAnalyzer:
             
             logger.info("Analyzing hashtag usage patterns")
             
-            posts = self.repository.get_posts_by_date_range(start_date, end_date)
+            posts = self._get_posts_window(start_date, end_date)
             
             if not posts:
                 return {
@@ -402,32 +530,40 @@ class HashtagAnalyzer:
                     'message': 'Немає постів з хештегами'
                 }
             
-            total_hashtags = sum(len(p.hashtags) for p in posts_with_hashtags)
-            avg_hashtags_per_post = total_hashtags / len(posts_with_hashtags)
-            
-            # Find most frequently used hashtags
-            all_hashtags = []
-            for post in posts_with_hashtags:
-                all_hashtags.extend([tag.lstrip('#').lower() for tag in post.hashtags])
-            
-            hashtag_frequency = Counter(all_hashtags)
+            # Count straight off a flat generator: no intermediate
+            # list of every tag, and Counter dispatches to its C-level
+            # counting fast path
+            hashtag_frequency = Counter(
+                chain.from_iterable(p.hashtags_clean for p in posts_with_hashtags)
+            )
             most_common = hashtag_frequency.most_common(20)
+
+            total_hashtags = sum(hashtag_frequency.values())
+            avg_hashtags_per_post = total_hashtags / len(posts_with_hashtags)
             
-            # Analyze correlation between hashtag count and engagement
-            engagement_by_count = defaultdict(list)
-            
-            for post in posts_with_hashtags:
-                count_bucket = (len(post.hashtags) // 5) * 5  # Group by 5s
-                engagement_by_count[count_bucket].append(post.engagement_rate)
-            
-            optimal_count_data = []
-            for count, engagements in sorted(engagement_by_count.items()):
-                avg_engagement = sum(engagements) / len(engagements)
-                optimal_count_data.append({
-                    'hashtag_count_range': f"{count}-{count+4}",
-                    'posts_count': len(engagements),
-                    'avg_engagement_rate': round(avg_engagement, 2)
-                })
+            # Analyze correlation between hashtag count and engagement:
+            # tag counts // 5 index bincount slots (group by 5s), so
+            # per-bucket counts and engagement sums fall out of two
+            # C-level sweeps with no dict-of-lists intermediate
+            import numpy as np
+
+            n = len(posts_with_hashtags)
+            lens = np.fromiter((len(p.hashtags) for p in posts_with_hashtags), dtype=np.intp, count=n)
+            engs = np.fromiter((p.engagement_rate for p in posts_with_hashtags), dtype=np.float64, count=n)
+            buckets = lens // 5
+            bucket_counts = np.bincount(buckets)
+            bucket_sums = np.bincount(buckets, weights=engs)
+
+            # np.nonzero walks the buckets in ascending order, matching
+            # the old sorted() output
+            optimal_count_data = [
+                {
+                    'hashtag_count_range': f"{bucket * 5}-{bucket * 5 + 4}",
+                    'posts_count': int(bucket_counts[bucket]),
+                    'avg_engagement_rate': round(float(bucket_sums[bucket] / bucket_counts[bucket]), 2)
+                }
+                for bucket in np.nonzero(bucket_counts)[0]
+            ]
             
             # Find optimal count
             optimal = max(optimal_count_data, key=lambda x: x['avg_engagement_rate']) if optimal_count_data else None
@@ -464,27 +600,6 @@ class HashtagAnalyzer:
                 'message': str(e)
             }
     
-    def _calculate_recommendation_score(self, hashtag: Hashtag) -> float:
-        """Calculate recommendation score for a hashtag."""
-        score = 0.0
-        
-        # Engagement rate (40%)
-        score += hashtag.avg_engagement_rate * 4
-        
-        # Usage count (20%) - moderate usage is good
-        usage_score = min(20, hashtag.usage_count * 2)
-        score += usage_score
-        
-        # Trending bonus (20%)
-        if hashtag.is_trending:
-            score += 20
-        
-        # Reach (20%)
-        reach_score = min(20, hashtag.avg_reach / 100)
-        score += reach_score
-        
-        return min(100, score)
-    
     def _get_recommendation_reason(self, hashtag: Hashtag, score: float) -> str:
         """Get reason for recommending a hashtag."""
         reasons = []
@@ -619,6 +734,12 @@ class HashtagAnalyzer:
         
         return recommendations
     
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def close(self):
         """Close repository connection."""
         if self.repository:
@@ -1,5 +1,6 @@
 """Performance metrics analysis for Instagram content."""
-from datetime import datetime, timedelta
+import time
+from datetime import date, datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 from collections import defaultdict
 from sqlalchemy import func
@@ -10,6 +11,35 @@ from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# How long a fetched post window is shared between analyses; the
+# methods here all scan the same recent posts, so sibling calls reuse
+# one SELECT instead of re-reading the table per metric
+_POSTS_WINDOW_TTL = 30
+
+
+def _post_columns(posts: List[Post]) -> Dict[str, Any]:
+    """Columnar views of a post window for vectorized aggregation.
+
+    One pass over the ORM rows fills contiguous NumPy arrays; the
+    bucketed means and sums then run as C reductions instead of
+    per-post Python loops.
+    """
+    import numpy as np
+
+    n = len(posts)
+    # 4-byte elements: the metric scans are memory-bound, so halving
+    # the working set halves the bandwidth they pull. bincount upcasts
+    # weights to float64 internally, and the summary sums request
+    # float64 accumulators, so no precision is lost on totals.
+    return {
+        'engagement': np.fromiter((p.engagement_rate for p in posts), dtype=np.float32, count=n),
+        'likes': np.fromiter((p.likes_count for p in posts), dtype=np.float32, count=n),
+        'comments': np.fromiter((p.comments_count for p in posts), dtype=np.float32, count=n),
+        'days': np.fromiter((p.posted_at.toordinal() for p in posts), dtype=np.int32, count=n),
+        'hours': np.fromiter((p.posted_at.hour for p in posts), dtype=np.int32, count=n),
+        'weekdays': np.fromiter((p.posted_at.weekday() for p in posts), dtype=np.int32, count=n),
+    }
+
 
 class PerformanceAnalyzer:
     """Analyzer for content performance metrics and trends."""
@@ -22,7 +52,46 @@ class PerformanceAnalyzer:
             repository: Repository instance (creates new one if not provided)
         """
         self.repository = repository or Repository()
-    
+        self._window_cache: Dict[tuple, tuple] = {}
+
+    def _get_posts_window(self, start_date: datetime, end_date: datetime) -> List[Post]:
+        """Posts for a date window, shared across sibling analyses."""
+        key = (start_date.date(), end_date.date())
+        hit = self._window_cache.get(key)
+        if hit and time.monotonic() - hit[0] < _POSTS_WINDOW_TTL:
+            return hit[1]
+
+        posts = self.repository.get_posts_by_date_range(start_date, end_date)
+        self._window_cache[key] = (time.monotonic(), posts)
+        return posts
+
+    def bulk_compute(
+        self,
+        days: int = 30,
+        timing_days: int = 90
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Compute every performance analysis over shared post windows.
+
+        The five analyses below scan the same few windows; routing them
+        through the window cache collapses their repeated SELECTs into
+        one fetch per distinct window.
+
+        Args:
+            days: Window for trends, content types, top posts, insights
+            timing_days: Window for posting-time analysis
+
+        Returns:
+            Dictionary with trends/timing/content/top_posts/insights
+        """
+        return {
+            'trends': self.analyze_engagement_trends(days=days),
+            'timing': self.find_best_posting_times(days=timing_days),
+            'content': self.analyze_content_type_performance(days=days),
+            'top_posts': self.get_top_performing_posts(limit=5, days=days),
+            'insights': self.get_performance_insights(days=days),
+        }
+
     def analyze_engagement_trends(
         self, 
         days: int = 30,
@@ -45,7 +114,7 @@ class PerformanceAnalyzer:
             logger.info(f"Analyzing engagement trends from {start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}")
             
             # Get posts in date range
-            posts = self.repository.get_posts_by_date_range(start_date, end_date)
+            posts = self._get_posts_window(start_date, end_date)
             
             if not posts:
                 return {
@@ -54,36 +123,29 @@ class PerformanceAnalyzer:
                     'period': {'start': start_date, 'end': end_date}
                 }
             
-            # Group by date
-            daily_data = defaultdict(lambda: {
-                'posts': [],
-                'total_likes': 0,
-                'total_comments': 0,
-                'total_engagement': 0,
-                'avg_engagement_rate': 0
-            })
-            
-            for post in posts:
-                date_key = post.posted_at.date()
-                daily_data[date_key]['posts'].append(post)
-                daily_data[date_key]['total_likes'] += post.likes_count
-                daily_data[date_key]['total_comments'] += post.comments_count
-            
-            # Calculate daily metrics
-            timeline = []
-            for date in sorted(daily_data.keys()):
-                data = daily_data[date]
-                posts_list = data['posts']
-                
-                avg_engagement = sum(p.engagement_rate for p in posts_list) / len(posts_list)
-                
-                timeline.append({
-                    'date': date.isoformat(),
-                    'posts_count': len(posts_list),
-                    'total_likes': data['total_likes'],
-                    'total_comments': data['total_comments'],
-                    'avg_engagement_rate': round(avg_engagement, 2)
-                })
+            import numpy as np
+
+            # Group by date with bincount over day ordinals: sums and
+            # means per day run as vectorized reductions
+            cols = _post_columns(posts)
+            day_ids, day_index = np.unique(cols['days'], return_inverse=True)
+            day_counts = np.bincount(day_index)
+            day_likes = np.bincount(day_index, weights=cols['likes'])
+            day_comments = np.bincount(day_index, weights=cols['comments'])
+            day_engagement = np.bincount(day_index, weights=cols['engagement']) / day_counts
+
+            # np.unique returns the days sorted, matching the old order
+            timeline = [
+                {
+                    'date': date.fromordinal(int(day_id)).isoformat(),
+                    'posts_count': int(count),
+                    'total_likes': int(likes),
+                    'total_comments': int(comments),
+                    'avg_engagement_rate': round(float(engagement), 2)
+                }
+                for day_id, count, likes, comments, engagement
+                in zip(day_ids, day_counts, day_likes, day_comments, day_engagement)
+            ]
             
             # Calculate trend direction
             if len(timeline) >= 2:
@@ -95,11 +157,11 @@ class PerformanceAnalyzer:
                 trend_direction = 'недостатньо даних'
                 trend_change = 0
             
-            # Overall statistics
+            # Overall statistics from the same columns
             total_posts = len(posts)
-            avg_engagement = sum(p.engagement_rate for p in posts) / total_posts
-            total_likes = sum(p.likes_count for p in posts)
-            total_comments = sum(p.comments_count for p in posts)
+            avg_engagement = float(cols['engagement'].mean(dtype=np.float64))
+            total_likes = int(cols['likes'].sum(dtype=np.float64))
+            total_comments = int(cols['comments'].sum(dtype=np.float64))
             
             return {
                 'status': 'success',
@@ -151,7 +213,7 @@ class PerformanceAnalyzer:
             
             logger.info(f"Analyzing posting times from {start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}")
             
-            posts = self.repository.get_posts_by_date_range(start_date, end_date)
+            posts = self._get_posts_window(start_date, end_date)
             
             if not posts:
                 return {
@@ -159,49 +221,42 @@ class PerformanceAnalyzer:
                     'message': 'Немає даних для аналізу'
                 }
             
-            # Group by hour and day of week
-            hour_stats = defaultdict(lambda: {'posts': [], 'total_engagement': 0})
-            weekday_stats = defaultdict(lambda: {'posts': [], 'total_engagement': 0})
-            
-            for post in posts:
-                hour = post.posted_at.hour
-                weekday = post.posted_at.weekday()
-                
-                hour_stats[hour]['posts'].append(post)
-                hour_stats[hour]['total_engagement'] += post.engagement_rate
-                
-                weekday_stats[weekday]['posts'].append(post)
-                weekday_stats[weekday]['total_engagement'] += post.engagement_rate
-            
-            # Calculate average engagement by hour
-            hours_data = []
-            for hour in range(24):
-                if hour in hour_stats:
-                    data = hour_stats[hour]
-                    avg_engagement = data['total_engagement'] / len(data['posts'])
-                    hours_data.append({
-                        'hour': hour,
-                        'posts_count': len(data['posts']),
-                        'avg_engagement_rate': round(avg_engagement, 2)
-                    })
-            
+            import numpy as np
+
+            # Bucket engagement by hour and weekday with bincount — two
+            # vectorized passes instead of Python grouping dicts
+            cols = _post_columns(posts)
+            hour_counts = np.bincount(cols['hours'], minlength=24)
+            hour_engagement = np.bincount(cols['hours'], weights=cols['engagement'], minlength=24)
+
+            hours_data = [
+                {
+                    'hour': hour,
+                    'posts_count': int(hour_counts[hour]),
+                    'avg_engagement_rate': round(float(hour_engagement[hour] / hour_counts[hour]), 2)
+                }
+                for hour in range(24)
+                if hour_counts[hour]
+            ]
+
             # Sort and get top hours
             best_hours = sorted(hours_data, key=lambda x: x['avg_engagement_rate'], reverse=True)[:5]
-            
+
             # Calculate average engagement by weekday
             weekday_names = ['Понеділок', 'Вівторок', 'Середа', 'Четвер', 'П\'ятниця', 'Субота', 'Неділя']
-            weekdays_data = []
-            
-            for day in range(7):
-                if day in weekday_stats:
-                    data = weekday_stats[day]
-                    avg_engagement = data['total_engagement'] / len(data['posts'])
-                    weekdays_data.append({
-                        'day': day,
-                        'day_name': weekday_names[day],
-                        'posts_count': len(data['posts']),
-                        'avg_engagement_rate': round(avg_engagement, 2)
-                    })
+            weekday_counts = np.bincount(cols['weekdays'], minlength=7)
+            weekday_engagement = np.bincount(cols['weekdays'], weights=cols['engagement'], minlength=7)
+
+            weekdays_data = [
+                {
+                    'day': day,
+                    'day_name': weekday_names[day],
+                    'posts_count': int(weekday_counts[day]),
+                    'avg_engagement_rate': round(float(weekday_engagement[day] / weekday_counts[day]), 2)
+                }
+                for day in range(7)
+                if weekday_counts[day]
+            ]
             
             # Sort and get best days
             best_days = sorted(weekdays_data, key=lambda x: x['avg_engagement_rate'], reverse=True)[:3]
@@ -248,7 +303,7 @@ class PerformanceAnalyzer:
             
             logger.info(f"Analyzing content types from {start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}")
             
-            posts = self.repository.get_posts_by_date_range(start_date, end_date)
+            posts = self._get_posts_window(start_date, end_date)
             
             if not posts:
                 return {
@@ -354,7 +409,7 @@ class PerformanceAnalyzer:
             
             logger.info(f"Getting top {limit} posts by {metric}")
             
-            posts = self.repository.get_posts_by_date_range(start_date, end_date)
+            posts = self._get_posts_window(start_date, end_date)
             
             if not posts:
                 return {
@@ -560,6 +615,12 @@ class PerformanceAnalyzer:
         
         return recommendations
     
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def close(self):
         """Close repository connection."""
         if self.repository:
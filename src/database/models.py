@@ -1,9 +1,11 @@
 """Database models for SMM analytics."""
 from datetime import datetime
+from functools import cached_property
 from typing import Optional
 from sqlalchemy import (
     create_engine,
     Column,
+    Index,
     Integer,
     String,
     Text,
@@ -17,6 +19,20 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session, relationship
 from config.settings import settings
 
+try:
+    # Optional: orjson (de)serializes JSON columns several times faster
+    import orjson
+
+    def _json_serializer(obj):
+        return orjson.dumps(obj).decode()
+
+    _json_deserializer = orjson.loads
+except ImportError:
+    import json
+
+    _json_serializer = json.dumps
+    _json_deserializer = json.loads
+
 Base = declarative_base()
 
 
@@ -50,7 +66,18 @@ class Post(Base):
     
     # Relationships
     ai_recommendations = relationship("AIRecommendation", back_populates="post", cascade="all, delete-orphan")
-    
+
+    @cached_property
+    def hashtags_clean(self) -> tuple:
+        """Lowercased tags without the leading '#', cleaned once per instance."""
+        if not self.hashtags or not isinstance(self.hashtags, list):
+            return ()
+        # Slice on a startswith check instead of lstrip's char-set scan
+        return tuple(
+            (tag[1:] if tag.startswith('#') else tag).lower()
+            for tag in self.hashtags
+        )
+
     def __repr__(self):
         return f"<Post {self.post_id} - {self.posted_at:%Y-%m-%d}>"
 
@@ -158,7 +185,12 @@ class AIRecommendation(Base):
     """AI-generated recommendations for content."""
     
     __tablename__ = 'ai_recommendations'
-    
+    __table_args__ = (
+        # Serves the per-post recommendation lookups and the batch
+        # WHERE post_id IN (...) filter without a full scan
+        Index('ix_rec_post_type', 'post_id', 'recommendation_type'),
+    )
+
     id = Column(Integer, primary_key=True)
     post_id = Column(Integer, ForeignKey('posts.id'), nullable=True)
     recommendation_type = Column(String(50))  # caption, hashtags, timing, general
@@ -171,7 +203,10 @@ class AIRecommendation(Base):
     analysis = Column(Text)
     score = Column(Float)  # Quality score 0-10
     suggestions = Column(JSON)  # List of suggestions
-    
+
+    # Content-addressed cache key (hash of caption + bucketed metrics)
+    caption_sha = Column(String(40), index=True)
+
     # Metadata
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
     applied = Column(Boolean, default=False)
@@ -208,7 +243,7 @@ class Competitor(Base):
     top_post_engagement = Column(Float, default=0.0)
     
     # Analysis
-    posting_frequency = Column(Float)  # Posts per day
+    posting_frequency = Column(Float, default=0.0)  # Posts per day
     best_posting_times = Column(JSON)  # List of optimal hours
     popular_hashtags = Column(JSON)  # Most used hashtags
     
@@ -216,6 +251,11 @@ class Competitor(Base):
     last_analyzed = Column(DateTime, default=datetime.utcnow, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    @cached_property
+    def last_analyzed_iso(self) -> Optional[str]:
+        """ISO-formatted last_analyzed, rendered once per instance."""
+        return self.last_analyzed.isoformat() if self.last_analyzed else None
+
     def __repr__(self):
         return f"<Competitor @{self.username}>"
 
@@ -262,22 +302,72 @@ _SessionLocal = None
 
 
 def get_engine():
-    """Get or create database engine."""
+    """Get or create database engine.
+
+    The singleton engine keeps a connection pool alive for the whole
+    process, so short-lived Repository instances reuse connections
+    instead of paying the connect/auth handshake per call.
+    """
     global _engine
     if _engine is None:
         settings.ensure_directories()
+        is_sqlite = "sqlite" in settings.DATABASE_URL
+        pool_kwargs = {} if is_sqlite else {
+            "pool_size": 10,
+            "max_overflow": 20,
+            "pool_recycle": 1800,
+        }
         _engine = create_engine(
             settings.DATABASE_URL,
             echo=settings.DEBUG,
-            connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
+            pool_pre_ping=True,
+            json_serializer=_json_serializer,
+            json_deserializer=_json_deserializer,
+            connect_args={"check_same_thread": False} if is_sqlite else {},
+            **pool_kwargs
         )
     return _engine
 
 
+def _upgrade_schema(engine):
+    """Apply additive schema changes create_all cannot make.
+
+    create_all only creates missing tables; a column added to an
+    already-existing table (caption_sha on ai_recommendations) needs
+    an explicit ALTER on databases created before the column existed,
+    and composite indexes on such tables never get created either.
+    """
+    with engine.begin() as conn:
+        columns = {
+            row[1] for row in
+            conn.exec_driver_sql("PRAGMA table_info(ai_recommendations)")
+        }
+        if not columns:
+            # Table does not exist yet; create_all just built it fresh
+            return
+
+        if 'caption_sha' not in columns:
+            conn.exec_driver_sql(
+                "ALTER TABLE ai_recommendations "
+                "ADD COLUMN caption_sha VARCHAR(40)"
+            )
+            conn.exec_driver_sql(
+                "CREATE INDEX IF NOT EXISTS ix_ai_recommendations_caption_sha "
+                "ON ai_recommendations (caption_sha)"
+            )
+
+        conn.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS ix_rec_post_type "
+            "ON ai_recommendations (post_id, recommendation_type)"
+        )
+
+
 def init_db():
     """Initialize database and create all tables."""
     engine = get_engine()
     Base.metadata.create_all(bind=engine)
+    if "sqlite" in settings.DATABASE_URL:
+        _upgrade_schema(engine)
     return engine
 
 
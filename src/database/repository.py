@@ -1,7 +1,9 @@
 """Database repository for data access operations."""
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
-from sqlalchemy import func, desc, and_, or_
+from typing import Any, Dict, List, Optional
+from sqlalchemy import func, desc, and_, or_, text
 from sqlalchemy.orm import Session
 from src.database.models import (
     Post, Story, Reel, DailyStat, AIRecommendation,
@@ -12,6 +14,29 @@ from src.utils.logger import get_logger
 logger = get_logger(__name__)
 
 
+@dataclass(slots=True)
+class CompetitorColumns:
+    """Columnar (structure-of-arrays) view of the competitors table.
+
+    Numeric columns are NumPy float64 arrays so analytics code can
+    reduce them in C (mean, argsort, boolean sums) instead of touching
+    ORM attributes row by row; identity columns stay plain lists.
+    """
+
+    usernames: List[str]
+    full_names: List[Optional[str]]
+    followers: Any
+    posts_counts: Any
+    engagement: Any
+    likes: Any
+    comments: Any
+    posting_freq: Any
+    last_analyzed: List[Optional[str]]  # ISO strings, rendered once per fetch
+
+    def __len__(self) -> int:
+        return len(self.usernames)
+
+
 class Repository:
     """Repository class for database operations."""
     
@@ -23,6 +48,20 @@ class Repository:
         """Close database session."""
         if self.session:
             self.session.close()
+
+    @contextmanager
+    def transaction(self):
+        """Group several writes into a single commit.
+
+        Writes issued with commit=False inside the block are flushed
+        together, halving commit round-trips versus per-row commits.
+        """
+        try:
+            yield
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
     
     # Post operations
     def create_post(self, post_data: Dict[str, Any]) -> Post:
@@ -46,6 +85,81 @@ class Repository:
             and_(Post.posted_at >= start_date, Post.posted_at <= end_date)
         ).order_by(desc(Post.posted_at)).all()
     
+    def iter_posts_by_date_range(
+        self, start_date: datetime, end_date: datetime, batch: int = 500
+    ):
+        """Stream posts within date range without materializing the full list."""
+        return self.session.query(Post).filter(
+            and_(Post.posted_at >= start_date, Post.posted_at <= end_date)
+        ).order_by(desc(Post.posted_at)).execution_options(
+            stream_results=True
+        ).yield_per(batch)
+
+    def get_posts_aggregate(
+        self, start_date: datetime, end_date: datetime
+    ) -> Dict[str, Any]:
+        """Count and metric averages for posts in a range, computed in SQL.
+
+        One aggregate row replaces fetching every Post just to average
+        three columns in Python.
+        """
+        row = self.session.query(
+            func.count(Post.id),
+            func.coalesce(func.avg(Post.engagement_rate), 0.0),
+            func.coalesce(func.avg(Post.likes_count), 0.0),
+            func.coalesce(func.avg(Post.comments_count), 0.0),
+        ).filter(
+            and_(Post.posted_at >= start_date, Post.posted_at <= end_date)
+        ).one()
+
+        return {
+            'posts_count': row[0],
+            'avg_engagement_rate': float(row[1]),
+            'avg_likes': float(row[2]),
+            'avg_comments': float(row[3]),
+        }
+
+    def get_hashtag_aggregates(
+        self, start_date: datetime, end_date: datetime
+    ) -> List[Dict[str, Any]]:
+        """Per-tag post aggregates over a date window, grouped in SQL.
+
+        json_each unnests the stored hashtag lists inside SQLite, so
+        one row per distinct raw tag crosses into Python instead of
+        every post's full JSON payload. Tags are returned as stored;
+        callers normalize them (SQLite's lower() is ASCII-only, which
+        would mangle Cyrillic tags).
+        """
+        rows = self.session.execute(
+            text(
+                """
+                SELECT je.value AS tag,
+                       COUNT(*) AS usage_count,
+                       SUM(posts.likes_count) AS total_likes,
+                       SUM(posts.comments_count) AS total_comments,
+                       SUM(posts.reach) AS total_reach,
+                       SUM(posts.engagement_rate) AS total_engagement,
+                       MAX(posts.engagement_rate) AS best_engagement,
+                       MIN(posts.engagement_rate) AS worst_engagement
+                FROM posts, json_each(posts.hashtags) AS je
+                WHERE json_type(posts.hashtags) = 'array'
+                  AND posts.posted_at >= :start
+                  AND posts.posted_at <= :end
+                GROUP BY je.value
+                """
+            ),
+            {'start': start_date, 'end': end_date},
+        ).all()
+
+        return [dict(row._mapping) for row in rows]
+
+    def avg_engagement(self, start_date: datetime, end_date: datetime) -> float:
+        """Average engagement rate over a date range, computed in SQL."""
+        value = self.session.query(func.avg(Post.engagement_rate)).filter(
+            and_(Post.posted_at >= start_date, Post.posted_at <= end_date)
+        ).scalar()
+        return float(value) if value is not None else 0.0
+
     def get_recent_posts(self, limit: int = 10) -> List[Post]:
         """Get most recent posts."""
         return self.session.query(Post).order_by(
@@ -134,16 +248,75 @@ class Repository:
             and_(DailyStat.date >= start_date, DailyStat.date <= end_date)
         ).order_by(DailyStat.date).all()
     
+    def get_endpoint_followers(
+        self, start_date: datetime, end_date: datetime
+    ) -> tuple:
+        """Followers count on the first and last day of a date range.
+
+        Two indexed LIMIT 1 queries instead of transferring every row
+        just to read the endpoints.
+        """
+        base = self.session.query(DailyStat.followers_count).filter(
+            and_(DailyStat.date >= start_date, DailyStat.date <= end_date)
+        )
+        first = base.order_by(DailyStat.date).first()
+        last = base.order_by(desc(DailyStat.date)).first()
+        return (
+            first[0] if first else 0,
+            last[0] if last else 0,
+        )
+
+    def get_daily_stats_aggregate(
+        self, start_date: datetime, end_date: datetime
+    ) -> Dict[str, Any]:
+        """Aggregate daily statistics in SQL instead of Python loops.
+
+        Returns one row of totals/averages, so large ranges never
+        transfer every DailyStat row just to be summed.
+        """
+        row = self.session.query(
+            func.count(DailyStat.id),
+            func.coalesce(func.sum(DailyStat.posts_count), 0),
+            func.coalesce(func.sum(DailyStat.stories_count), 0),
+            func.coalesce(func.sum(DailyStat.reels_count), 0),
+            func.coalesce(func.avg(DailyStat.avg_engagement_rate), 0.0),
+        ).filter(
+            and_(DailyStat.date >= start_date, DailyStat.date <= end_date)
+        ).one()
+
+        return {
+            'days_count': row[0],
+            'total_posts': row[1],
+            'total_stories': row[2],
+            'total_reels': row[3],
+            'avg_engagement': float(row[4]),
+        }
+
     # AI Recommendation operations
-    def create_recommendation(self, rec_data: Dict[str, Any]) -> AIRecommendation:
-        """Create a new AI recommendation."""
+    def create_recommendation(
+        self, rec_data: Dict[str, Any], commit: bool = True
+    ) -> AIRecommendation:
+        """Create a new AI recommendation.
+
+        Pass commit=False inside a transaction() block to defer the
+        commit to the end of the block.
+        """
         recommendation = AIRecommendation(**rec_data)
         self.session.add(recommendation)
-        self.session.commit()
-        self.session.refresh(recommendation)
+        if commit:
+            self.session.commit()
+            self.session.refresh(recommendation)
         logger.info(f"Created AI recommendation: {recommendation.recommendation_type}")
         return recommendation
     
+    def bulk_create_recommendations(self, rows: List[Dict[str, Any]]) -> None:
+        """Insert many AI recommendations in a single statement/commit."""
+        if not rows:
+            return
+        self.session.bulk_insert_mappings(AIRecommendation, rows)
+        self.session.commit()
+        logger.info(f"Created {len(rows)} AI recommendations in bulk")
+
     def get_recent_recommendations(self, limit: int = 10) -> List[AIRecommendation]:
         """Get recent AI recommendations."""
         return self.session.query(AIRecommendation).order_by(
@@ -155,6 +328,61 @@ class Repository:
         return self.session.query(AIRecommendation).filter(
             AIRecommendation.post_id == post_id
         ).all()
+
+    def get_recent_recommendations_projected(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get recent recommendations as plain dicts without ORM hydration.
+
+        Selecting only the projected columns skips instance construction
+        and identity-map bookkeeping for pure read-and-display callers.
+        """
+        rows = self.session.query(
+            AIRecommendation.id,
+            AIRecommendation.recommendation_type,
+            AIRecommendation.score,
+            AIRecommendation.analysis,
+            AIRecommendation.original_text,
+            AIRecommendation.improved_text,
+            AIRecommendation.created_at,
+        ).order_by(desc(AIRecommendation.created_at)).limit(limit).all()
+
+        return [
+            {
+                'id': row.id,
+                'type': row.recommendation_type,
+                'score': row.score,
+                'analysis': row.analysis,
+                'original_text': row.original_text,
+                'improved_text': row.improved_text,
+                'created_at': row.created_at,
+            }
+            for row in rows
+        ]
+
+    def get_recommendations_for_post_ids(
+        self, post_ids: List[int]
+    ) -> Dict[int, List[AIRecommendation]]:
+        """Get recommendations for many posts in a single query.
+
+        Avoids the N+1 pattern of one query per post; IDs are chunked to
+        stay under SQL parameter limits.
+        """
+        results: Dict[int, List[AIRecommendation]] = {pid: [] for pid in post_ids}
+
+        for i in range(0, len(post_ids), 1000):
+            chunk = post_ids[i:i + 1000]
+            rows = self.session.query(AIRecommendation).filter(
+                AIRecommendation.post_id.in_(chunk)
+            ).all()
+            for rec in rows:
+                results[rec.post_id].append(rec)
+
+        return results
+
+    def get_recommendation_by_hash(self, caption_sha: str) -> Optional[AIRecommendation]:
+        """Get the most recent recommendation matching a caption hash."""
+        return self.session.query(AIRecommendation).filter(
+            AIRecommendation.caption_sha == caption_sha
+        ).order_by(desc(AIRecommendation.created_at)).first()
     
     # Competitor operations
     def create_or_update_competitor(
@@ -185,6 +413,67 @@ class Repository:
             desc(Competitor.last_analyzed)
         ).all()
     
+    def get_competitors_columnar(self) -> CompetitorColumns:
+        """Get all competitors as columnar NumPy-backed arrays.
+
+        A column projection keeps the ORM out of the hot path entirely:
+        no Competitor instances are materialized and the numeric
+        columns land in contiguous float64 arrays ready for vectorized
+        reductions.
+        """
+        import numpy as np
+
+        rows = self.session.query(
+            Competitor.username,
+            Competitor.full_name,
+            Competitor.followers_count,
+            Competitor.posts_count,
+            Competitor.avg_engagement_rate,
+            Competitor.avg_likes,
+            Competitor.avg_comments,
+            Competitor.posting_frequency,
+            Competitor.last_analyzed,
+        ).all()
+
+        n = len(rows)
+        return CompetitorColumns(
+            usernames=[r[0] for r in rows],
+            full_names=[r[1] for r in rows],
+            followers=np.fromiter((r[2] or 0 for r in rows), dtype=np.int64, count=n),
+            posts_counts=np.fromiter((r[3] or 0 for r in rows), dtype=np.int64, count=n),
+            engagement=np.fromiter((r[4] or 0.0 for r in rows), dtype=np.float64, count=n),
+            likes=np.fromiter((r[5] or 0.0 for r in rows), dtype=np.float64, count=n),
+            comments=np.fromiter((r[6] or 0.0 for r in rows), dtype=np.float64, count=n),
+            posting_freq=np.fromiter((r[7] or 0.0 for r in rows), dtype=np.float64, count=n),
+            last_analyzed=[r[8].isoformat() if r[8] else None for r in rows],
+        )
+
+    def get_competitors_ranked(self) -> List[Competitor]:
+        """Get all competitors ordered by engagement rate, highest first."""
+        return self.session.query(Competitor).order_by(
+            desc(Competitor.avg_engagement_rate)
+        ).all()
+
+    def get_competitor_market_stats(self) -> Dict[str, Any]:
+        """Market-wide competitor aggregates computed in SQL.
+
+        One row of pre-aggregated numbers instead of pulling every
+        Competitor record through the ORM just to average it.
+        """
+        row = self.session.query(
+            func.count(Competitor.id),
+            func.coalesce(func.avg(Competitor.avg_engagement_rate), 0.0),
+            func.coalesce(func.avg(Competitor.followers_count), 0.0),
+            func.coalesce(func.max(Competitor.avg_engagement_rate), 0.0),
+        ).one()
+
+        return {
+            'total_competitors': row[0],
+            'avg_engagement_rate': float(row[1]),
+            'avg_followers': float(row[2]),
+            'top_engagement': float(row[3]),
+        }
+
     def get_competitor(self, username: str) -> Optional[Competitor]:
         """Get competitor by username."""
         return self.session.query(Competitor).filter(
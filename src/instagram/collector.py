@@ -292,9 +292,10 @@ class DataCollector:
                 'following_count': user_info['following_count'],
                 'posts_count': user_info['media_count'],
                 'recent_posts': posts[:10],
+                # Round once on write so read paths serve the values as-is
                 'avg_engagement_rate': round(avg_engagement, 2),
-                'avg_likes': round(avg_likes, 2),
-                'avg_comments': round(avg_comments, 2),
+                'avg_likes': round(avg_likes, 0),
+                'avg_comments': round(avg_comments, 0),
                 'top_post_id': top_post,
                 'top_post_engagement': round(top_engagement, 2),
             }
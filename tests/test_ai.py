@@ -29,6 +29,27 @@ def test_extract_score():
     assert analyzer._extract_score(text2) == 8.0
 
 
+def test_extract_score_labeled_beats_bare():
+    """A labeled score wins over an earlier bare 'N/10' mention."""
+    analyzer = AIAnalyzer(api_key='test')
+
+    text = "Порівняно з постом на 3/10 цей кращий.\nОЦІНКА: 7"
+    assert analyzer._extract_score(text) == 7.0
+
+
+def test_extract_hashtags_skips_improved_block():
+    """Hashtags inside the improved caption are not recommendations."""
+    analyzer = AIAnalyzer(api_key='test')
+
+    text = (
+        "Рекомендовані хештеги: #marketing #smm\n"
+        "ПОКРАЩЕНИЙ ВАРІАНТ: Новий текст із #sale та #promo"
+    )
+    hashtags = analyzer._extract_hashtags(text)
+
+    assert hashtags == ['#marketing', '#smm']
+
+
 def test_extract_hashtags():
     """Test hashtag extraction from AI response."""
     analyzer = AIAnalyzer(api_key='test')
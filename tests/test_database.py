@@ -68,6 +68,89 @@ def test_create_story(repository):
     assert story.views_count == 100
 
 
+def test_bulk_create_recommendations(repository):
+    """Test inserting many recommendations in one commit."""
+    rows = [
+        {
+            'recommendation_type': 'caption',
+            'analysis': f'Analysis {i}',
+            'score': 5.0 + i,
+            'caption_sha': f'bulk{i}',
+        }
+        for i in range(3)
+    ]
+
+    repository.bulk_create_recommendations(rows)
+
+    for i in range(3):
+        rec = repository.get_recommendation_by_hash(f'bulk{i}')
+        assert rec is not None
+        assert rec.score == 5.0 + i
+
+
+def test_get_recommendations_for_post_ids(repository):
+    """Test batched recommendation lookup with chunked IDs."""
+    post = repository.create_post({
+        'post_id': 'rec_fanout',
+        'media_type': 'photo',
+        'posted_at': datetime.now(),
+    })
+    repository.create_recommendation({
+        'post_id': post.id,
+        'recommendation_type': 'caption',
+        'score': 7.0,
+    })
+
+    # More than one 1000-id chunk; missing posts map to empty lists
+    post_ids = [post.id] + list(range(100000, 101500))
+    results = repository.get_recommendations_for_post_ids(post_ids)
+
+    assert len(results) == len(post_ids)
+    assert len(results[post.id]) == 1
+    assert results[post.id][0].score == 7.0
+    assert results[100000] == []
+
+
+def test_transaction_rollback(repository):
+    """Test that deferred writes roll back when the block raises."""
+    with repository.transaction():
+        repository.create_recommendation(
+            {'recommendation_type': 'caption', 'caption_sha': 'tx_ok'},
+            commit=False
+        )
+    assert repository.get_recommendation_by_hash('tx_ok') is not None
+
+    with pytest.raises(ValueError):
+        with repository.transaction():
+            repository.create_recommendation(
+                {'recommendation_type': 'caption', 'caption_sha': 'tx_fail'},
+                commit=False
+            )
+            raise ValueError('boom')
+    assert repository.get_recommendation_by_hash('tx_fail') is None
+
+
+def test_get_recommendation_by_hash(repository):
+    """Test caption-hash lookup returns the newest match."""
+    repository.create_recommendation({
+        'recommendation_type': 'caption',
+        'caption_sha': 'sha_lookup',
+        'score': 4.0,
+        'created_at': datetime(2026, 1, 1),
+    })
+    repository.create_recommendation({
+        'recommendation_type': 'caption',
+        'caption_sha': 'sha_lookup',
+        'score': 8.0,
+        'created_at': datetime(2026, 2, 1),
+    })
+
+    rec = repository.get_recommendation_by_hash('sha_lookup')
+    assert rec is not None
+    assert rec.score == 8.0
+    assert repository.get_recommendation_by_hash('sha_missing') is None
+
+
 def test_create_daily_stat(repository):
     """Test creating/updating daily statistics."""
     date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)